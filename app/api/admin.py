@@ -0,0 +1,153 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import FileResponse
+from typing import List
+from app.models.schemas import IngestionRequest, IngestionJobStatus, ProfileInfo
+from app.services import profiling
+from app.services.ingestion import IngestionJob, IngestionManager
+from app.api.auth import verify_admin_key
+from app.api.endpoints import get_ingestion_manager
+from app.config import VECTOR_DB_TYPE, INGESTION_UPLOAD_DIR, INGESTION_DATA_DIR, INGESTION_MAX_UPLOAD_BYTES
+import logging
+import os
+import tempfile
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(dependencies=[Depends(verify_admin_key)])
+
+def _check_replace_supported(replace: bool):
+    """Reject replace for Pinecone, whose upserts add to the live index and can't build a fresh one"""
+    if replace and VECTOR_DB_TYPE != "faiss":
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="replace is only supported with VECTOR_DB_TYPE=faiss"
+        )
+
+def _job_status(job: IngestionJob) -> IngestionJobStatus:
+    return IngestionJobStatus(
+        job_id=job.job_id,
+        source=job.source,
+        replace=job.replace,
+        status=job.status,
+        total_records=job.total_records,
+        processed_records=job.processed_records,
+        failed_records=job.failed_records,
+        records_per_second=job.records_per_second,
+        errors=job.errors,
+        profile_id=job.profile_id,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at
+    )
+
+@router.post("/ingest", response_model=IngestionJobStatus, status_code=status.HTTP_202_ACCEPTED)
+async def submit_ingestion_endpoint(
+    request: IngestionRequest,
+    manager: IngestionManager = Depends(get_ingestion_manager)
+):
+    """
+    Queue ingestion of a CSV file already present on the server under INGESTION_DATA_DIR
+    """
+    _check_replace_supported(request.replace)
+    data_dir = os.path.realpath(INGESTION_DATA_DIR)
+    path = os.path.realpath(request.path)
+    if os.path.commonpath([data_dir, path]) != data_dir:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Data files must be inside INGESTION_DATA_DIR ({INGESTION_DATA_DIR})"
+        )
+    if not os.path.isfile(path):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Data file not found: {request.path}")
+    return _job_status(manager.submit(path, replace=request.replace, profile=request.profile))
+
+@router.post("/ingest/upload", response_model=IngestionJobStatus, status_code=status.HTTP_202_ACCEPTED)
+async def upload_ingestion_endpoint(
+    request: Request,
+    replace: bool = False,
+    profile: bool = False,
+    manager: IngestionManager = Depends(get_ingestion_manager)
+):
+    """
+    Queue ingestion of a CSV file streamed as the request body
+    
+    The body is spooled to INGESTION_UPLOAD_DIR chunk by chunk and deleted when the job ends.
+    Bodies larger than INGESTION_MAX_UPLOAD_BYTES are rejected.
+    """
+    _check_replace_supported(replace)
+    too_large = HTTPException(
+        status_code=413,  # Named HTTP_413_CONTENT_TOO_LARGE or HTTP_413_REQUEST_ENTITY_TOO_LARGE depending on Starlette version
+        detail=f"Upload exceeds {INGESTION_MAX_UPLOAD_BYTES} bytes"
+    )
+    content_length = request.headers.get("content-length")
+    if content_length is not None and content_length.isdigit() and int(content_length) > INGESTION_MAX_UPLOAD_BYTES:
+        raise too_large
+    
+    os.makedirs(INGESTION_UPLOAD_DIR, exist_ok=True)
+    upload = tempfile.NamedTemporaryFile(dir=INGESTION_UPLOAD_DIR, suffix=".csv", delete=False)
+    try:
+        with upload:
+            received = 0
+            async for chunk in request.stream():
+                # Content-Length may be absent (chunked uploads) or wrong, so count what actually arrives
+                received += len(chunk)
+                if received > INGESTION_MAX_UPLOAD_BYTES:
+                    raise too_large
+                upload.write(chunk)
+    except Exception:
+        os.remove(upload.name)
+        raise
+    logger.info(f"Received ingestion upload {upload.name}")
+    return _job_status(manager.submit(upload.name, replace=replace, cleanup=True, profile=profile))
+
+@router.get("/ingest", response_model=List[IngestionJobStatus])
+async def list_ingestion_endpoint(manager: IngestionManager = Depends(get_ingestion_manager)):
+    """
+    List ingestion jobs, newest first
+    """
+    return [_job_status(job) for job in manager.list_jobs()]
+
+@router.get("/ingest/{job_id}", response_model=IngestionJobStatus)
+async def ingestion_status_endpoint(
+    job_id: str,
+    manager: IngestionManager = Depends(get_ingestion_manager)
+):
+    """
+    Report progress, throughput and errors of an ingestion job
+    """
+    job = manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return _job_status(job)
+
+@router.delete("/ingest/{job_id}", response_model=IngestionJobStatus)
+async def cancel_ingestion_endpoint(
+    job_id: str,
+    manager: IngestionManager = Depends(get_ingestion_manager)
+):
+    """
+    Cancel a queued or running ingestion job
+    """
+    job = manager.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return _job_status(job)
+
+@router.get("/profiles", response_model=List[ProfileInfo])
+async def list_profiles_endpoint():
+    """
+    List saved request and ingestion profiles, newest first
+    """
+    return [
+        ProfileInfo(profile_id=profile_id, size_bytes=size_bytes, created_at=created_at)
+        for profile_id, size_bytes, created_at in profiling.list_profiles()
+    ]
+
+@router.get("/profiles/{profile_id}")
+async def profile_endpoint(profile_id: str):
+    """
+    Download a profile in folded-stack format (flamegraph.pl, speedscope)
+    """
+    path = profiling.profile_path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+    return FileResponse(path, media_type="text/plain", filename=f"{profile_id}{profiling.PROFILE_SUFFIX}")
@@ -0,0 +1,20 @@
+from fastapi import Header, HTTPException, status
+from typing import Optional
+from app.config import ADMIN_API_KEY
+import hmac
+
+def is_admin_key(key: Optional[str]) -> bool:
+    """Whether key matches ADMIN_API_KEY, compared in constant time (always False when no key is configured)"""
+    if not ADMIN_API_KEY or not key:
+        return False
+    return hmac.compare_digest(key.encode("utf-8"), ADMIN_API_KEY.encode("utf-8"))
+
+def verify_admin_key(x_admin_key: Optional[str] = Header(None)):
+    """Reject admin requests without the configured key; the admin API is disabled when ADMIN_API_KEY is unset"""
+    if not ADMIN_API_KEY:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin API is disabled, set ADMIN_API_KEY to enable it"
+        )
+    if not is_admin_key(x_admin_key):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid admin key")
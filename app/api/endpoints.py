@@ -1,10 +1,31 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from app.models.schemas import QueryRequest, QueryResponse, StatusResponse, SimilarExample
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, HTTPException, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from openai import APITimeoutError
+from typing import Optional
+from app.models.schemas import QueryRequest, QueryResponse, StatusResponse, ExampleResponse, MetricsResponse
 from app.services.vector_db import VectorDBService
 from app.services.embedding import EmbeddingService
 from app.services.llm import LLMService
-from app.config import DATASET_PATH
+from app.services.session import SessionStore
+from app.services.ingestion import IngestionManager
+from app.services.admission import AdmissionController, AdmissionRejected, Deadline, DeadlineExceeded
+from app.services.metrics import metrics
+from app.services import profiling
+from app.api.auth import is_admin_key
+from app.config import (
+    DATASET_PATH,
+    EXAMPLE_CACHE_MAX_AGE,
+    QUERY_TIMEOUT_SECONDS,
+    QUERY_LLM_MIN_SECONDS,
+    QUERY_RETRY_AFTER_SECONDS
+)
+import asyncio
 import logging
+import orjson
+import os
+import re
+import uuid
+from contextlib import asynccontextmanager, nullcontext
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -12,6 +33,17 @@ router = APIRouter()
 # Global service instances
 _vector_db = None
 _llm_service = None
+_session_store = None
+_ingestion_manager = None
+_admission_controller = None
+
+REQUEST_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+# Sent instead of an LLM completion when a query is answered in degraded mode
+DEGRADED_RESPONSE = (
+    "I'm sorry, I can't write a personal response right now because the service is very busy. "
+    "Here are some responses from counselors to similar situations that may help."
+)
 
 # Dependency to get services
 def get_vector_db():
@@ -34,46 +66,245 @@ def get_llm_service():
         _llm_service = LLMService()
     return _llm_service
 
+def get_session_store():
+    global _session_store
+    if _session_store is None:
+        _session_store = SessionStore()
+    return _session_store
+
+def get_ingestion_manager():
+    global _ingestion_manager
+    if _ingestion_manager is None:
+        _ingestion_manager = IngestionManager(get_vector_db())
+    return _ingestion_manager
+
+def get_admission_controller():
+    global _admission_controller
+    if _admission_controller is None:
+        _admission_controller = AdmissionController()
+    return _admission_controller
+
 @router.post("/query", response_model=QueryResponse)
 async def query_endpoint(
     request: QueryRequest,
+    background_tasks: BackgroundTasks,
+    x_request_timeout: Optional[float] = Header(None, gt=0, description="Seconds the client will wait for an answer"),
+    x_request_id: Optional[str] = Header(None, description="Client request ID, echoed in the response"),
+    x_profile: bool = Header(False, description="Profile this request (requires a valid X-Admin-Key)"),
+    x_admin_key: Optional[str] = Header(None),
     vector_db: VectorDBService = Depends(get_vector_db),
-    llm_service: LLMService = Depends(get_llm_service)
+    llm_service: LLMService = Depends(get_llm_service),
+    session_store: SessionStore = Depends(get_session_store),
+    ingestion_manager: IngestionManager = Depends(get_ingestion_manager),
+    admission: AdmissionController = Depends(get_admission_controller)
 ):
     """
     Process a mental health query and return a counseling response
     """
     logger.info(f"Received query: {request.query[:50]}...")
     
-    # Check if index exists and create if not
+    # Build the index in the background rather than on this request thread
     if vector_db.index is None:
-        try:
-            vector_db.load_data(DATASET_PATH)
-        except Exception as e:
+        if not os.path.exists(DATASET_PATH):
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Failed to load dataset: {str(e)}"
+                detail=f"Failed to load dataset: {DATASET_PATH} not found"
             )
+        ingestion_manager.submit_once(DATASET_PATH)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Vector database is still loading, please retry shortly",
+            headers={"Retry-After": "10"}
+        )
+    
+    headers = {"X-Request-ID": x_request_id if x_request_id and REQUEST_ID_PATTERN.match(x_request_id) else uuid.uuid4().hex}
+    # Profile IDs are always generated here, so clients can't overwrite other profiles
+    profile_id = None
+    if profiling.should_profile(x_profile and is_admin_key(x_admin_key)):
+        profile_id = f"query-{uuid.uuid4().hex}"
+        headers["X-Profile-ID"] = profile_id
+    
+    deadline = Deadline(min(x_request_timeout or QUERY_TIMEOUT_SECONDS, QUERY_TIMEOUT_SECONDS))
+    try:
+        async with admission.admit(deadline) as slot:
+            # Only admitted work is profiled, shed requests never start a sampler
+            async with profiling.profile_request_async(profile_id) if profile_id else nullcontext():
+                content = await _answer_query(request, deadline, slot, vector_db, llm_service, session_store, background_tasks)
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": str(QUERY_RETRY_AFTER_SECONDS)}
+        )
+    except DeadlineExceeded as e:
+        metrics.increment("requests_timed_out")
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail=f"Request deadline exceeded during {str(e)}"
+        )
     
-    # Find similar examples
-    similar_results = vector_db.search(request.query)
+    # Returning the response directly skips response_model validation and the default JSON encoder;
+    # FastAPI still attaches background_tasks to it
+    return Response(content=orjson.dumps(content), media_type="application/json", headers=headers)
+
+async def _answer_query(request, deadline, slot, vector_db, llm_service, session_store, background_tasks):
+    """Run the retrieval and LLM stages of a query within its deadline and build the response body"""
+    session = session_store.get_or_create(request.session_id)
+    async with _session_locked(session, deadline):
+        # Find similar examples, reusing the previous turn's when the topic hasn't shifted
+        query_embedding = await _run_stage("embedding", deadline, slot, vector_db.embed_query, request.query)
+        if session.is_same_topic(query_embedding):
+            logger.info(f"Reusing examples from previous turn of session {session.session_id}")
+            similar_results = session.last_examples
+        else:
+            similar_results = await _run_stage("search", deadline, slot, vector_db.search_by_embedding, query_embedding)
+            session.last_query_embedding = query_embedding
+            session.last_examples = similar_results
+        
+        # Generate response using LLM, unless too little of the deadline is left for it
+        response_text = None
+        if deadline.remaining() >= QUERY_LLM_MIN_SECONDS:
+            try:
+                response_text = await _run_stage(
+                    "llm",
+                    deadline,
+                    slot,
+                    llm_service.generate_response,
+                    request.query,
+                    similar_results,
+                    summary=session.summary,
+                    history=list(session.recent_turns),
+                    timeout=deadline.remaining()
+                )
+            except (DeadlineExceeded, APITimeoutError):
+                pass
+        
+        degraded = response_text is None
+        if degraded:
+            metrics.increment("requests_degraded")
+            response_text = DEGRADED_RESPONSE
+        else:
+            session.add_turn(request.query, response_text)
+            # Fold older turns into the rolling summary so the prompt stays bounded, after the
+            # response has been sent so this turn doesn't pay for a second LLM call
+            if session.needs_summary():
+                session.summary_pending = True
+                background_tasks.add_task(
+                    _summarize_session, session, llm_service, session.summary, list(session.recent_turns)
+                )
+    
+    # Build the JSON body straight from the search results; orjson serializes the slotted
+    # SearchResult dataclasses as SimilarExample objects without a dict per hit
+    content = {"response": response_text, "session_id": session.session_id, "degraded": degraded}
+    if request.include_example_text or degraded:
+        content["similar_examples"] = similar_results
+    else:
+        # Clients that don't display examples only get IDs, and fetch texts via /examples/{id};
+        # this still builds one two-key dict per hit, which is small next to the example texts
+        content["example_refs"] = [item.as_reference() for item in similar_results]
+    return content
+
+@asynccontextmanager
+async def _session_locked(session, deadline):
+    """
+    Hold a session's lock, waiting for it no longer than the request deadline
+
+    Turns of one session run one at a time; a request queued behind a slow turn
+    times out instead of keeping its admission slot taken past its deadline.
+    """
+    try:
+        await asyncio.wait_for(session.lock.acquire(), timeout=deadline.remaining())
+    except asyncio.TimeoutError:
+        raise DeadlineExceeded("session")
+    try:
+        yield
+    finally:
+        session.lock.release()
+
+async def _run_stage(stage, deadline, slot, func, *args, **kwargs):
+    """
+    Run a blocking stage on the threadpool, timing it, bounding it by the request deadline and profiling it if requested
+
+    A thread can't be interrupted, so a stage past the deadline keeps running; it is
+    registered with the request's admission slot, which stays taken until it finishes.
+    """
+    remaining = deadline.remaining()
+    if remaining <= 0:
+        raise DeadlineExceeded(stage)
+    work = asyncio.ensure_future(run_in_threadpool(profiling.traced(func), *args, **kwargs))
+    slot.hold_until_done(work)
+    with metrics.timed(stage):
+        try:
+            # shield: on timeout stop waiting, without cancelling the task the thread reports to
+            return await asyncio.wait_for(asyncio.shield(work), timeout=remaining)
+        except asyncio.TimeoutError:
+            raise DeadlineExceeded(stage)
+
+async def _summarize_session(session, llm_service, summary, turns):
+    """Background task folding a session's verbatim turns into its rolling summary"""
+    try:
+        with metrics.timed("summarize"):
+            summary = await run_in_threadpool(
+                llm_service.summarize_conversation, summary, turns, timeout=QUERY_TIMEOUT_SECONDS
+            )
+    except Exception as e:
+        logger.error(f"Failed to summarize session {session.session_id}: {str(e)}")
+        summary = None
+    # Without a new summary the turns stay verbatim and are summarized after the next turn
+    async with session.lock:
+        if summary is not None:
+            session.apply_summary(summary, len(turns))
+        session.summary_pending = False
+
+@router.get("/examples/{example_id}", response_model=ExampleResponse)
+async def example_endpoint(
+    example_id: str,
+    request: Request,
+    response: Response,
+    vector_db: VectorDBService = Depends(get_vector_db)
+):
+    """
+    Return a single counseling example by ID
     
-    # Generate response using LLM
-    response_text = llm_service.generate_response(request.query, similar_results)
+    Example IDs are derived from the example text, so the ID doubles as a strong ETag.
+    Existence is checked before answering 304, so removed examples turn into 404s.
+    """
+    if vector_db.index is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Example not found")
+    example = vector_db.get_example(example_id)
+    if example is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Example not found")
     
-    # Format similar examples for response
-    similar_examples = [
-        SimilarExample(
-            context=item["Context"],
-            response=item["Response"],
-            similarity_score=item["similarity_score"]
-        ) for item in similar_results
-    ]
+    etag = f'"{example_id}"'
+    cache_control = f"public, max-age={EXAMPLE_CACHE_MAX_AGE}"
+    if etag in [tag.strip() for tag in request.headers.get("if-none-match", "").split(",")]:
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers={"ETag": etag, "Cache-Control": cache_control}
+        )
     
-    return QueryResponse(
-        response=response_text,
-        similar_examples=similar_examples
-    )
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control
+    return ExampleResponse(id=example["id"], context=example["Context"], response=example["Response"])
+
+@router.delete("/sessions/{session_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_session_endpoint(
+    session_id: str,
+    session_store: SessionStore = Depends(get_session_store)
+):
+    """
+    End a conversation session and discard its stored context
+    """
+    if not session_store.delete(session_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Session not found")
+
+@router.get("/metrics", response_model=MetricsResponse)
+async def metrics_endpoint(admission: AdmissionController = Depends(get_admission_controller)):
+    """
+    Request counters (admitted, shed, degraded, timed out) and per-stage timing totals
+    """
+    counters, stages = metrics.snapshot()
+    return MetricsResponse(counters=counters, stages=stages, in_flight=admission.in_flight, queued=admission.queued)
 
 @router.get("/status", response_model=StatusResponse)
 async def status_endpoint():
@@ -32,6 +32,47 @@ try:
     # Similarity search settings
     TOP_K_RESULTS = int(os.getenv("TOP_K_RESULTS", "5"))
 
+    # Conversation session settings
+    SESSION_TTL_SECONDS = int(os.getenv("SESSION_TTL_SECONDS", "1800"))
+    SESSION_MAX_SESSIONS = int(os.getenv("SESSION_MAX_SESSIONS", "10000"))
+    SESSION_SUMMARY_INTERVAL = int(os.getenv("SESSION_SUMMARY_INTERVAL", "4"))  # Turns kept verbatim before summarizing
+    SESSION_TOPIC_SIMILARITY = float(os.getenv("SESSION_TOPIC_SIMILARITY", "0.85"))  # Cosine threshold to reuse examples
+
+    # Response settings
+    COMPRESSION_MINIMUM_SIZE = int(os.getenv("COMPRESSION_MINIMUM_SIZE", "500"))  # Responses smaller than this (bytes) are sent uncompressed
+    EXAMPLE_CACHE_MAX_AGE = int(os.getenv("EXAMPLE_CACHE_MAX_AGE", "86400"))  # Cache lifetime (seconds) for GET /examples/{id}
+
+    # Pinecone metadata settings
+    PINECONE_METADATA_MODE = os.getenv("PINECONE_METADATA_MODE", "full")  # 'full' stores texts in Pinecone, 'local' keeps them in the local metadata store
+    METADATA_STORE_PATH = os.getenv("METADATA_STORE_PATH", "data/metadata_store")  # Directory of the local memory-mapped metadata store
+
+    # Ingestion settings
+    INGESTION_MAX_WORKERS = int(os.getenv("INGESTION_MAX_WORKERS", "1"))  # Concurrent background ingestion jobs
+    INGESTION_BATCH_SIZE = int(os.getenv("INGESTION_BATCH_SIZE", "30"))  # Records embedded and indexed per batch
+    INGESTION_UPLOAD_DIR = os.getenv("INGESTION_UPLOAD_DIR", "data/uploads")  # Where streamed CSV uploads are spooled
+    INGESTION_DATA_DIR = os.getenv("INGESTION_DATA_DIR", "data")  # POST /admin/ingest only accepts files under this directory
+    INGESTION_MAX_UPLOAD_BYTES = int(os.getenv("INGESTION_MAX_UPLOAD_BYTES", "104857600"))  # Larger uploads are rejected with 413
+    ADMIN_API_KEY = os.getenv("ADMIN_API_KEY")  # Required in the X-Admin-Key header for /admin endpoints, which are disabled when unset
+
+    # FAISS sharding settings
+    FAISS_NUM_SHARDS = int(os.getenv("FAISS_NUM_SHARDS", "1"))  # Shards the local corpus is split into
+    FAISS_SHARD_STRATEGY = os.getenv("FAISS_SHARD_STRATEGY", "hash")  # 'hash' (by example ID) or 'batch' (round-robin per ingested batch)
+    FAISS_SEARCH_WORKERS = int(os.getenv("FAISS_SEARCH_WORKERS", "0"))  # Threads used to search shards in parallel, 0 = one per shard
+    FAISS_INDEX_PATH = os.getenv("FAISS_INDEX_PATH")  # Directory the sharded FAISS index is saved to and loaded from (unset = not persisted)
+
+    # Admission control settings
+    QUERY_MAX_IN_FLIGHT = int(os.getenv("QUERY_MAX_IN_FLIGHT", "8"))  # Queries processed concurrently
+    QUERY_MAX_QUEUED = int(os.getenv("QUERY_MAX_QUEUED", "32"))  # Queries allowed to wait for a slot before new ones are shed
+    QUERY_TIMEOUT_SECONDS = float(os.getenv("QUERY_TIMEOUT_SECONDS", "30"))  # Default and maximum per-query deadline
+    QUERY_LLM_MIN_SECONDS = float(os.getenv("QUERY_LLM_MIN_SECONDS", "3"))  # Below this remaining budget, answer with examples only
+    QUERY_RETRY_AFTER_SECONDS = int(os.getenv("QUERY_RETRY_AFTER_SECONDS", "2"))  # Retry-After sent with shed requests
+
+    # Profiling settings
+    PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))  # Fraction of /query requests profiled without the X-Profile header
+    PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))  # Stack sampling interval
+    PROFILE_DIR = os.getenv("PROFILE_DIR", "data/profiles")  # Where folded-stack profiles are written, one file per request or job
+    PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", "200"))  # Oldest profiles are deleted beyond this count
+
 except:
     import os
     import streamlit as st
@@ -66,4 +107,45 @@ except:
     DATASET_PATH = os.getenv("DATASET_PATH", "data/train.csv")
 
     # Similarity search settings
-    TOP_K_RESULTS = int(st.secrets.get("TOP_K_RESULTS", os.getenv("TOP_K_RESULTS", "5")))
\ No newline at end of file
+    TOP_K_RESULTS = int(st.secrets.get("TOP_K_RESULTS", os.getenv("TOP_K_RESULTS", "5")))
+
+    # Conversation session settings
+    SESSION_TTL_SECONDS = int(st.secrets.get("SESSION_TTL_SECONDS", os.getenv("SESSION_TTL_SECONDS", "1800")))
+    SESSION_MAX_SESSIONS = int(st.secrets.get("SESSION_MAX_SESSIONS", os.getenv("SESSION_MAX_SESSIONS", "10000")))
+    SESSION_SUMMARY_INTERVAL = int(st.secrets.get("SESSION_SUMMARY_INTERVAL", os.getenv("SESSION_SUMMARY_INTERVAL", "4")))
+    SESSION_TOPIC_SIMILARITY = float(st.secrets.get("SESSION_TOPIC_SIMILARITY", os.getenv("SESSION_TOPIC_SIMILARITY", "0.85")))
+
+    # Response settings
+    COMPRESSION_MINIMUM_SIZE = int(st.secrets.get("COMPRESSION_MINIMUM_SIZE", os.getenv("COMPRESSION_MINIMUM_SIZE", "500")))
+    EXAMPLE_CACHE_MAX_AGE = int(st.secrets.get("EXAMPLE_CACHE_MAX_AGE", os.getenv("EXAMPLE_CACHE_MAX_AGE", "86400")))
+
+    # Pinecone metadata settings
+    PINECONE_METADATA_MODE = st.secrets.get("PINECONE_METADATA_MODE", os.getenv("PINECONE_METADATA_MODE", "full"))
+    METADATA_STORE_PATH = st.secrets.get("METADATA_STORE_PATH", os.getenv("METADATA_STORE_PATH", "data/metadata_store"))
+
+    # Ingestion settings
+    INGESTION_MAX_WORKERS = int(st.secrets.get("INGESTION_MAX_WORKERS", os.getenv("INGESTION_MAX_WORKERS", "1")))
+    INGESTION_BATCH_SIZE = int(st.secrets.get("INGESTION_BATCH_SIZE", os.getenv("INGESTION_BATCH_SIZE", "30")))
+    INGESTION_UPLOAD_DIR = st.secrets.get("INGESTION_UPLOAD_DIR", os.getenv("INGESTION_UPLOAD_DIR", "data/uploads"))
+    INGESTION_DATA_DIR = st.secrets.get("INGESTION_DATA_DIR", os.getenv("INGESTION_DATA_DIR", "data"))
+    INGESTION_MAX_UPLOAD_BYTES = int(st.secrets.get("INGESTION_MAX_UPLOAD_BYTES", os.getenv("INGESTION_MAX_UPLOAD_BYTES", "104857600")))
+    ADMIN_API_KEY = st.secrets.get("ADMIN_API_KEY", os.getenv("ADMIN_API_KEY"))
+
+    # FAISS sharding settings
+    FAISS_NUM_SHARDS = int(st.secrets.get("FAISS_NUM_SHARDS", os.getenv("FAISS_NUM_SHARDS", "1")))
+    FAISS_SHARD_STRATEGY = st.secrets.get("FAISS_SHARD_STRATEGY", os.getenv("FAISS_SHARD_STRATEGY", "hash"))
+    FAISS_SEARCH_WORKERS = int(st.secrets.get("FAISS_SEARCH_WORKERS", os.getenv("FAISS_SEARCH_WORKERS", "0")))
+    FAISS_INDEX_PATH = st.secrets.get("FAISS_INDEX_PATH", os.getenv("FAISS_INDEX_PATH"))
+
+    # Admission control settings
+    QUERY_MAX_IN_FLIGHT = int(st.secrets.get("QUERY_MAX_IN_FLIGHT", os.getenv("QUERY_MAX_IN_FLIGHT", "8")))
+    QUERY_MAX_QUEUED = int(st.secrets.get("QUERY_MAX_QUEUED", os.getenv("QUERY_MAX_QUEUED", "32")))
+    QUERY_TIMEOUT_SECONDS = float(st.secrets.get("QUERY_TIMEOUT_SECONDS", os.getenv("QUERY_TIMEOUT_SECONDS", "30")))
+    QUERY_LLM_MIN_SECONDS = float(st.secrets.get("QUERY_LLM_MIN_SECONDS", os.getenv("QUERY_LLM_MIN_SECONDS", "3")))
+    QUERY_RETRY_AFTER_SECONDS = int(st.secrets.get("QUERY_RETRY_AFTER_SECONDS", os.getenv("QUERY_RETRY_AFTER_SECONDS", "2")))
+
+    # Profiling settings
+    PROFILE_SAMPLE_RATE = float(st.secrets.get("PROFILE_SAMPLE_RATE", os.getenv("PROFILE_SAMPLE_RATE", "0")))
+    PROFILE_INTERVAL_MS = float(st.secrets.get("PROFILE_INTERVAL_MS", os.getenv("PROFILE_INTERVAL_MS", "5")))
+    PROFILE_DIR = st.secrets.get("PROFILE_DIR", os.getenv("PROFILE_DIR", "data/profiles"))
+    PROFILE_MAX_FILES = int(st.secrets.get("PROFILE_MAX_FILES", os.getenv("PROFILE_MAX_FILES", "200")))
\ No newline at end of file
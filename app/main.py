@@ -1,12 +1,15 @@
 from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 import logging
+import os
 import uvicorn
 
-from app.api.endpoints import router as api_router
-from app.config import API_PREFIX
+from app.api.endpoints import router as api_router, get_ingestion_manager, get_vector_db
+from app.api.admin import router as admin_router
+from app.config import API_PREFIX, COMPRESSION_MINIMUM_SIZE, VECTOR_DB_TYPE, DATASET_PATH
 
 # Configure logging
 logging.basicConfig(
@@ -14,6 +17,8 @@ logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
 )
 
+logger = logging.getLogger(__name__)
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Mental Health Counseling API",
@@ -30,8 +35,30 @@ app.add_middleware(
     allow_headers=["*"],  # Allows all headers
 )
 
+# Compress responses, preferring brotli when the optional brotli-asgi package is installed
+try:
+    from brotli_asgi import BrotliMiddleware
+    app.add_middleware(BrotliMiddleware, minimum_size=COMPRESSION_MINIMUM_SIZE, gzip_fallback=True)
+except ImportError:
+    app.add_middleware(GZipMiddleware, minimum_size=COMPRESSION_MINIMUM_SIZE)
+
 # Include API router
 app.include_router(api_router, prefix=API_PREFIX)
+app.include_router(admin_router, prefix=f"{API_PREFIX}/admin", tags=["admin"])
+
+@app.on_event("startup")
+def start_initial_ingestion():
+    """Load the persisted FAISS index, or start building it in the background so the first query doesn't wait for it"""
+    if VECTOR_DB_TYPE != "faiss":
+        return
+    try:
+        if get_vector_db().load_index():
+            return
+    except Exception as e:
+        # A missing, partial or corrupt index is treated as no index: rebuild from the dataset
+        logger.error(f"Failed to load persisted FAISS index, rebuilding it: {str(e)}")
+    if os.path.exists(DATASET_PATH):
+        get_ingestion_manager().submit_once(DATASET_PATH)
 
 # Custom exception handler for validation errors
 @app.exception_handler(RequestValidationError)
@@ -1,21 +1,80 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Dict, List, Optional
+from datetime import datetime
 
 class QueryRequest(BaseModel):
     """Request model for counseling query"""
     query: str = Field(..., description="The user's query about a mental health challenge")
+    session_id: Optional[str] = Field(None, description="Conversation session to continue; a new session is started if omitted or expired")
+    include_example_text: bool = Field(True, description="Return full example texts; if false only example IDs and scores are returned")
 
 class SimilarExample(BaseModel):
     """Model for similar counseling examples"""
+    id: Optional[str] = None
     context: str
     response: str
     similarity_score: float
 
+class ExampleReference(BaseModel):
+    """Model for a similar example returned by ID only"""
+    id: str
+    similarity_score: float
+
+class ExampleResponse(BaseModel):
+    """Response model for a single counseling example"""
+    id: str
+    context: str
+    response: str
+
 class QueryResponse(BaseModel):
     """Response model for counseling query"""
     response: str
     similar_examples: Optional[List[SimilarExample]] = None
+    example_refs: Optional[List[ExampleReference]] = None
+    session_id: Optional[str] = None
+    degraded: bool = Field(False, description="True if the response was written without the LLM because of load or deadline")
     
 class StatusResponse(BaseModel):
     """Response model for status endpoint"""
     status: str
+
+class StageTiming(BaseModel):
+    """Cumulative timing of one request processing stage"""
+    count: int
+    total_seconds: float
+    max_seconds: float
+
+class MetricsResponse(BaseModel):
+    """Response model for the metrics endpoint"""
+    counters: Dict[str, int]
+    stages: Dict[str, StageTiming]
+    in_flight: int
+    queued: int
+
+class IngestionRequest(BaseModel):
+    """Request model for submitting an ingestion job"""
+    path: str = Field(..., description="Path on the server to a CSV file with Context and Response columns, inside INGESTION_DATA_DIR")
+    replace: bool = Field(False, description="Build a fresh index instead of adding to the current one (FAISS only)")
+    profile: bool = Field(False, description="Profile the ingestion run; the profile is saved as ingest-<job_id>")
+
+class IngestionJobStatus(BaseModel):
+    """Response model describing an ingestion job"""
+    job_id: str
+    source: str
+    replace: bool
+    status: str
+    total_records: int
+    processed_records: int
+    failed_records: int
+    records_per_second: float
+    errors: List[str]
+    profile_id: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+class ProfileInfo(BaseModel):
+    """Response model describing a saved profile"""
+    profile_id: str
+    size_bytes: int
+    created_at: datetime
@@ -0,0 +1,120 @@
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from app.services.metrics import metrics
+from app.config import QUERY_MAX_IN_FLIGHT, QUERY_MAX_QUEUED
+
+logger = logging.getLogger(__name__)
+
+class AdmissionRejected(Exception):
+    """Raised when a request is shed instead of being admitted"""
+
+class DeadlineExceeded(Exception):
+    """Raised when a request runs out of time before a stage completes"""
+
+class Deadline:
+    """Absolute point in time by which a request must be answered"""
+
+    def __init__(self, timeout_seconds: float):
+        self.timeout_seconds = timeout_seconds
+        self.expires_at = time.monotonic() + timeout_seconds
+
+    def remaining(self) -> float:
+        """Seconds left, never negative"""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+class AdmissionSlot:
+    """
+    Execution slot held by an admitted request
+
+    Work the request stops waiting for (e.g. a threadpool stage past the deadline)
+    keeps running, so it is registered here and the slot is only given back once
+    it has finished.
+    """
+
+    def __init__(self):
+        self._pending = set()
+
+    def hold_until_done(self, future):
+        """Keep the slot occupied until future completes, even if the request stops awaiting it"""
+        self._pending.add(future)
+        future.add_done_callback(self._forget)
+
+    def pending(self):
+        return [future for future in self._pending if not future.done()]
+
+    def _forget(self, future):
+        self._pending.discard(future)
+        if not future.cancelled():
+            future.exception()  # Mark as retrieved, the request has already reported its outcome
+
+class AdmissionController:
+    """
+    Bounds the number of in-flight and queued requests
+
+    Up to max_in_flight requests run at once and up to max_queued wait for a slot.
+    Anything beyond that is rejected immediately, and queued requests whose deadline
+    passes before a slot frees up are rejected too, so no work is started for
+    requests the client has already given up on. A request that times out keeps its
+    slot until its abandoned work finishes, so running work never exceeds max_in_flight.
+    """
+
+    def __init__(self, max_in_flight=QUERY_MAX_IN_FLIGHT, max_queued=QUERY_MAX_QUEUED):
+        self.max_in_flight = max_in_flight
+        self.max_queued = max_queued
+        self.in_flight = 0
+        self.queued = 0
+        self._semaphore = None  # Created on first use so it binds to the serving event loop
+
+    @asynccontextmanager
+    async def admit(self, deadline: Deadline):
+        """
+        Hold an execution slot for the duration of the block
+
+        Args:
+            deadline (Deadline): Request deadline; queueing stops when it passes
+
+        Yields:
+            AdmissionSlot: Slot to register work that may outlive the block
+
+        Raises:
+            AdmissionRejected: If the queue is full or the deadline passed while queued
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_in_flight)
+
+        # Counters rather than semaphore.locked(): waiters inside wait_for haven't taken a slot yet
+        if self.in_flight + self.queued >= self.max_in_flight + self.max_queued:
+            metrics.increment("requests_shed")
+            raise AdmissionRejected("Server is at capacity, please retry shortly")
+
+        self.queued += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=deadline.remaining())
+        except asyncio.TimeoutError:
+            metrics.increment("requests_shed")
+            raise AdmissionRejected("Request deadline passed while waiting in queue")
+        finally:
+            self.queued -= 1
+
+        self.in_flight += 1
+        metrics.increment("requests_admitted")
+        slot = AdmissionSlot()
+        try:
+            yield slot
+        finally:
+            pending = slot.pending()
+            if pending:
+                metrics.increment("requests_with_abandoned_work")
+                asyncio.gather(*pending, return_exceptions=True).add_done_callback(lambda _: self._release())
+            else:
+                self._release()
+
+    def _release(self):
+        self.in_flight -= 1
+        self._semaphore.release()
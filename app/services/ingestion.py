@@ -0,0 +1,193 @@
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import List, Optional
+import pandas as pd
+from app.services.vector_db import VectorDBService
+from app.services import profiling
+from app.config import INGESTION_MAX_WORKERS, INGESTION_BATCH_SIZE
+
+logger = logging.getLogger(__name__)
+
+MAX_JOB_ERRORS = 20  # Errors kept per job, later ones are only counted
+MAX_FINISHED_JOBS = 100  # Finished jobs kept for status queries, older ones are forgotten
+
+class IngestionJob:
+    """Progress and outcome of a background ingestion run"""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+    def __init__(self, source: str, replace: bool = False, cleanup: bool = False, profile: bool = False):
+        self.job_id = uuid.uuid4().hex
+        self.source = source
+        self.replace = replace
+        self.cleanup = cleanup  # Delete the source file when the job ends (uploads)
+        self.profile_id = f"ingest-{self.job_id}" if profile else None
+        self.status = self.QUEUED
+        self.total_records = 0
+        self.processed_records = 0
+        self.failed_records = 0
+        self.errors: List[str] = []
+        self.created_at = datetime.now()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self._cancel_event = threading.Event()
+        self._started = None  # time.monotonic() when the job started running
+        self._finished = None
+
+    @property
+    def is_active(self) -> bool:
+        return self.status in (self.QUEUED, self.RUNNING)
+
+    @property
+    def records_per_second(self) -> float:
+        """Ingestion throughput so far"""
+        if self._started is None:
+            return 0.0
+        elapsed = (self._finished or time.monotonic()) - self._started
+        return self.processed_records / elapsed if elapsed > 0 else 0.0
+
+    def add_error(self, message: str):
+        if len(self.errors) < MAX_JOB_ERRORS:
+            self.errors.append(message)
+
+    def cancel(self):
+        self._cancel_event.set()
+
+    @property
+    def cancel_requested(self) -> bool:
+        return self._cancel_event.is_set()
+
+class IngestionManager:
+    """Runs ingestion jobs on a bounded pool of background workers"""
+
+    def __init__(self, vector_db: VectorDBService, max_workers=INGESTION_MAX_WORKERS, batch_size=INGESTION_BATCH_SIZE):
+        self.vector_db = vector_db
+        self.batch_size = batch_size
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ingestion")
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, source: str, replace: bool = False, cleanup: bool = False, profile: bool = False) -> IngestionJob:
+        """
+        Queue a CSV file for ingestion
+
+        Args:
+            source (str): Path to a CSV file with Context and Response columns
+            replace (bool): Build a fresh index instead of adding to the current one
+            cleanup (bool): Delete the file once the job has finished
+            profile (bool): Profile the run and save it under the job's profile_id
+
+        Returns:
+            IngestionJob: The queued job
+        """
+        job = IngestionJob(source, replace=replace, cleanup=cleanup, profile=profile)
+        with self._lock:
+            self._prune_finished()
+            self._jobs[job.job_id] = job
+        self._executor.submit(self._run, job)
+        logger.info(f"Queued ingestion job {job.job_id} for {source}")
+        return job
+
+    def submit_once(self, source: str) -> IngestionJob:
+        """Queue a job for source unless one is already queued or running"""
+        with self._lock:
+            for job in self._jobs.values():
+                if job.source == source and job.is_active:
+                    return job
+        return self.submit(source)
+
+    def get(self, job_id: str) -> Optional[IngestionJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list_jobs(self) -> List[IngestionJob]:
+        with self._lock:
+            return sorted(self._jobs.values(), key=lambda job: job.created_at, reverse=True)
+
+    def cancel(self, job_id: str) -> Optional[IngestionJob]:
+        """
+        Request cancellation of a job
+
+        A running job stops at the next batch boundary. FAISS jobs discard their
+        staged batches; Pinecone batches upserted before cancellation remain.
+        """
+        job = self.get(job_id)
+        if job is not None and job.is_active:
+            job.cancel()
+            logger.info(f"Cancellation requested for ingestion job {job_id}")
+        return job
+
+    def _prune_finished(self):
+        """Forget the oldest finished jobs beyond MAX_FINISHED_JOBS (caller holds the lock)"""
+        finished = [job for job in self._jobs.values() if not job.is_active]
+        finished.sort(key=lambda job: job.finished_at)
+        for job in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[job.job_id]
+
+    def _run(self, job: IngestionJob):
+        """Worker entry point"""
+        if job.profile_id is None:
+            self._ingest(job)
+            return
+        with profiling.profile_current_thread(job.profile_id):
+            self._ingest(job)
+
+    def _ingest(self, job: IngestionJob):
+        """Load the job's CSV in batches and publish the result"""
+        if job.cancel_requested:
+            self._finish(job, IngestionJob.CANCELLED)
+            return
+
+        job.status = IngestionJob.RUNNING
+        job.started_at = datetime.now()
+        job._started = time.monotonic()
+        try:
+            df = pd.read_csv(job.source)
+            if 'Context' not in df.columns or 'Response' not in df.columns:
+                raise ValueError("Dataset must contain 'Context' and 'Response' columns")
+            job.total_records = len(df)
+
+            staging = self.vector_db.create_staging(replace=job.replace)
+            for i in range(0, len(df), self.batch_size):
+                if job.cancel_requested:
+                    self._finish(job, IngestionJob.CANCELLED)
+                    return
+                batch_df = df.iloc[i:i+self.batch_size]
+                try:
+                    staging.load_data(batch_df)
+                    job.processed_records += len(batch_df)
+                except Exception as e:
+                    job.failed_records += len(batch_df)
+                    job.add_error(f"Batch {i//self.batch_size + 1}: {str(e)}")
+                    logger.error(f"Ingestion job {job.job_id} failed to load batch: {str(e)}")
+
+            if job.processed_records == 0 and job.total_records > 0:
+                self._finish(job, IngestionJob.FAILED)
+                return
+
+            self.vector_db.publish(staging)
+            self._finish(job, IngestionJob.COMPLETED)
+        except Exception as e:
+            job.add_error(str(e))
+            logger.error(f"Ingestion job {job.job_id} failed: {str(e)}")
+            self._finish(job, IngestionJob.FAILED)
+
+    def _finish(self, job: IngestionJob, status: str):
+        job.finished_at = datetime.now()
+        job._finished = time.monotonic()
+        job.status = status  # Set last: a job that is no longer active always has finished_at
+        if job.cleanup and os.path.exists(job.source):
+            os.remove(job.source)
+        logger.info(
+            f"Ingestion job {job.job_id} {status}: {job.processed_records}/{job.total_records} records "
+            f"({job.records_per_second:.1f} records/s, {job.failed_records} failed)"
+        )
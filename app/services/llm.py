@@ -1,7 +1,8 @@
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Optional
 from app.config import OPENAI_API_KEY, OPENAI_MODEL
-from openai import OpenAI
+from app.services.search_result import SearchResult
+from openai import OpenAI, APITimeoutError
 
 logger = logging.getLogger(__name__)
 
@@ -14,16 +15,29 @@ class LLMService:
         if not OPENAI_API_KEY:
             logger.warning("OpenAI API key not found. LLM functionality will not work.")
     
-    def generate_response(self, query: str, similar_examples: List[Dict[str, Any]]) -> str:
+    def generate_response(
+        self,
+        query: str,
+        similar_examples: List[SearchResult],
+        summary: str = "",
+        history: Optional[List[Dict[str, str]]] = None,
+        timeout: Optional[float] = None
+    ) -> str:
         """
         Generate counseling response using LLM
         
         Args:
             query (str): The user's query
             similar_examples (list): List of similar examples from vector search
+            summary (str): Rolling summary of earlier turns in the conversation
+            history (list): Recent verbatim turns as {"query", "response"} dictionaries
+            timeout (float, optional): Seconds the request may take, without retries
             
         Returns:
             str: Generated counseling response
+            
+        Raises:
+            openai.APITimeoutError: If timeout is given and the request exceeds it
         """
         if not OPENAI_API_KEY:
             return "OpenAI API key not configured. Please set the OPENAI_API_KEY environment variable."
@@ -32,8 +46,8 @@ class LLMService:
         examples_text = ""
         for i, example in enumerate(similar_examples):
             examples_text += f"Example {i+1}:\n"
-            examples_text += f"User Challenge: {example['Context']}\n"
-            examples_text += f"Counseling Response: {example['Response']}\n\n"
+            examples_text += f"User Challenge: {example.context}\n"
+            examples_text += f"Counseling Response: {example.response}\n\n"
         
         system_prompt = """You are a supportive mental health counseling assistant. Your role is to provide helpful, 
 compassionate, and practical responses to people seeking guidance on everyday mental health challenges.
@@ -50,7 +64,7 @@ Your goal is to be helpful and reflect the same tone, style and approach shown i
 similar to the current user query. Please model your response style, tone, and helpfulness after these examples:
 
 {examples_text}
-
+{self._format_conversation(summary, history)}
 Based on the examples above, please provide a compassionate and helpful counseling response to the following mental health challenge:
 
 User Challenge: {query}
@@ -59,7 +73,7 @@ Counseling Response:"""
         
         try:
             logger.info("Sending request to OpenAI API")
-            response = self.client.chat.completions.create(
+            response = self._client_for(timeout).chat.completions.create(
                 model=self.model,
                 messages=[
                     {"role": "system", "content": system_prompt},
@@ -70,6 +84,75 @@ Counseling Response:"""
             )
             
             return response.choices[0].message.content.strip()
+        except APITimeoutError:
+            logger.warning(f"LLM request exceeded its {timeout}s budget")
+            raise
         except Exception as e:
             logger.error(f"Error generating response from LLM: {str(e)}")
             return "I'm sorry, but I'm having trouble providing a response at the moment. Please try again later."
+    
+    def summarize_conversation(self, summary: str, turns: List[Dict[str, str]], timeout: Optional[float] = None) -> Optional[str]:
+        """
+        Fold recent turns into the rolling conversation summary
+        
+        Args:
+            summary (str): Current summary (may be empty)
+            turns (list): Turns to fold in as {"query", "response"} dictionaries
+            timeout (float, optional): Seconds the request may take, without retries
+            
+        Returns:
+            str or None: Updated summary, or None if the LLM is unavailable or fails,
+                in which case the turns must be kept verbatim
+        """
+        if not OPENAI_API_KEY:
+            return None
+        
+        turns_text = "".join(
+            f"User: {turn['query']}\nCounselor: {turn['response']}\n\n" for turn in turns
+        )
+        
+        prompt = f"""Update the summary of this counseling conversation with the new turns below.
+Keep the user's main concerns, relevant personal details and any advice already given.
+Write at most 150 words.
+
+Current summary:
+{summary or "(none)"}
+
+New turns:
+{turns_text}
+Updated summary:"""
+        
+        try:
+            logger.info("Sending summarization request to OpenAI API")
+            response = self._client_for(timeout).chat.completions.create(
+                model=self.model,
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=300,
+                temperature=0.3
+            )
+            
+            return response.choices[0].message.content.strip()
+        except Exception as e:
+            logger.error(f"Error summarizing conversation: {str(e)}")
+            return None
+    
+    def _client_for(self, timeout: Optional[float]):
+        """Client to use for a call, bounded by timeout when one is given"""
+        if timeout is None:
+            return self.client
+        # Retries would overrun the caller's deadline, so a timed call gets one attempt
+        return self.client.with_options(timeout=timeout, max_retries=0)
+    
+    @staticmethod
+    def _format_conversation(summary: str, history: Optional[List[Dict[str, str]]]) -> str:
+        """Render the conversation context section of the prompt"""
+        if not summary and not history:
+            return ""
+        
+        conversation_text = "Here is the conversation with this user so far:\n\n"
+        if summary:
+            conversation_text += f"Summary of earlier conversation: {summary}\n\n"
+        for turn in history or []:
+            conversation_text += f"User: {turn['query']}\n"
+            conversation_text += f"Counselor: {turn['response']}\n\n"
+        return conversation_text
@@ -0,0 +1,140 @@
+import json
+import logging
+import mmap
+import os
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: appends are only serialized within this process
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+class MetadataStore:
+    """
+    Append-only, memory-mapped key-value store for example texts
+
+    Records are appended as JSON to a data file and located through a small
+    index file of "id<TAB>offset<TAB>length" lines. Reads slice the memory-mapped
+    data file, so looking up a handful of examples costs no disk round trip once
+    the pages are cached. Other processes (e.g. load_data.py) may append while the
+    API is serving: appends hold an exclusive lock on the index file across
+    processes, and unknown IDs trigger a re-read of the index tail.
+    """
+
+    DATA_FILE = "examples.dat"
+    INDEX_FILE = "examples.idx"
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self.data_path = os.path.join(path, self.DATA_FILE)
+        self.index_path = os.path.join(path, self.INDEX_FILE)
+        for file_path in (self.data_path, self.index_path):
+            open(file_path, "ab").close()
+
+        self._offsets: Dict[str, tuple] = {}  # ID -> (offset, length) in the data file
+        self._index_position = 0  # Bytes of the index file already read
+        self._mmap = None
+        self._lock = threading.Lock()
+        with self._lock:
+            self._read_index()
+        logger.info(f"Opened metadata store at {path} with {len(self._offsets)} records")
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def __contains__(self, record_id):
+        return record_id in self._offsets
+
+    def put_many(self, records: Iterable[Dict[str, Any]]) -> int:
+        """
+        Append records that are not already stored
+
+        Args:
+            records (iterable): Dictionaries with an 'id' key plus the fields to store
+
+        Returns:
+            int: Number of records written
+        """
+        with self._lock, open(self.index_path, "a", encoding="utf-8") as index_file:
+            # Held until the index lines are written, so another process can't append in between
+            if fcntl is not None:
+                fcntl.flock(index_file.fileno(), fcntl.LOCK_EX)
+            self._read_index()
+            data_chunks = []
+            index_lines = []
+            seen = set()
+            with open(self.data_path, "ab") as data_file:
+                offset = data_file.seek(0, os.SEEK_END)
+                for record in records:
+                    record_id = record['id']
+                    if record_id in self._offsets or record_id in seen:
+                        continue
+                    seen.add(record_id)
+                    payload = json.dumps(record, ensure_ascii=False).encode("utf-8")
+                    data_chunks.append(payload)
+                    index_lines.append(f"{record_id}\t{offset}\t{len(payload)}\n")
+                    offset += len(payload)
+                data_file.write(b"".join(data_chunks))
+                data_file.flush()
+                os.fsync(data_file.fileno())
+
+            # Index lines are written after the data so readers never see a dangling offset;
+            # closing the file releases the lock
+            index_file.write("".join(index_lines))
+            index_file.flush()
+            self._read_index()
+            return len(index_lines)
+
+    def get(self, record_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a record by ID
+
+        Args:
+            record_id (str): Record ID
+
+        Returns:
+            dict or None: The stored record, or None if it is unknown
+        """
+        location = self._offsets.get(record_id)
+        if location is None:
+            with self._lock:
+                self._read_index()
+            location = self._offsets.get(record_id)
+            if location is None:
+                return None
+
+        offset, length = location
+        data = self._mmap
+        if data is None or len(data) < offset + length:
+            with self._lock:
+                data = self._remap()
+        return json.loads(data[offset:offset + length])
+
+    def get_many(self, record_ids: Iterable[str]) -> List[Optional[Dict[str, Any]]]:
+        """Look up several records, returning None for unknown IDs"""
+        return [self.get(record_id) for record_id in record_ids]
+
+    def _read_index(self):
+        """Load index lines appended since the last read (caller holds the lock)"""
+        with open(self.index_path, "r", encoding="utf-8") as index_file:
+            index_file.seek(self._index_position)
+            while True:
+                line = index_file.readline()
+                if not line.endswith("\n"):
+                    break  # Missing or partially written line, pick it up on the next read
+                record_id, offset, length = line.rstrip("\n").split("\t")
+                self._offsets[record_id] = (int(offset), int(length))
+                self._index_position = index_file.tell()
+
+    def _remap(self):
+        """Memory-map the current data file (caller holds the lock)"""
+        if os.path.getsize(self.data_path) == 0:
+            return b""
+        with open(self.data_path, "rb") as data_file:
+            # Earlier maps are left to the garbage collector since readers may still hold them
+            self._mmap = mmap.mmap(data_file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._mmap
@@ -0,0 +1,41 @@
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Dict
+
+class Metrics:
+    """Process-wide request counters and per-stage timing totals"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, int] = defaultdict(int)
+        self._stages: Dict[str, Dict[str, float]] = {}
+
+    def increment(self, name: str, value: int = 1):
+        with self._lock:
+            self._counters[name] += value
+
+    def observe(self, stage: str, seconds: float):
+        """Record the duration of one execution of a stage"""
+        with self._lock:
+            timing = self._stages.setdefault(stage, {"count": 0, "total_seconds": 0.0, "max_seconds": 0.0})
+            timing["count"] += 1
+            timing["total_seconds"] += seconds
+            timing["max_seconds"] = max(timing["max_seconds"], seconds)
+
+    @contextmanager
+    def timed(self, stage: str):
+        """Time the enclosed block as one execution of stage"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - started)
+
+    def snapshot(self):
+        """Copy of the current counters and stage timings"""
+        with self._lock:
+            return dict(self._counters), {stage: dict(timing) for stage, timing in self._stages.items()}
+
+metrics = Metrics()
@@ -0,0 +1,169 @@
+import functools
+import logging
+import os
+import random
+import re
+import sys
+import threading
+from collections import Counter
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import List, Optional, Tuple
+from fastapi.concurrency import run_in_threadpool
+from app.config import PROFILE_SAMPLE_RATE, PROFILE_INTERVAL_MS, PROFILE_DIR, PROFILE_MAX_FILES
+
+logger = logging.getLogger(__name__)
+
+PROFILE_SUFFIX = ".folded"
+PROFILE_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+# Profiler of the request being handled; copied into threadpool workers with the rest of the context
+_current_profiler: ContextVar[Optional["SamplingProfiler"]] = ContextVar("current_profiler", default=None)
+
+class SamplingProfiler:
+    """
+    Low-overhead statistical profiler for a set of threads
+
+    A background thread snapshots the stacks of the tracked threads every interval
+    and counts identical stacks. Only threads doing work for the profiled request or
+    job are tracked, so concurrent requests don't show up in its profile. Output is
+    in folded-stack format, readable by flamegraph.pl and speedscope.
+    """
+
+    def __init__(self, interval_seconds: float = PROFILE_INTERVAL_MS / 1000):
+        self.interval_seconds = interval_seconds
+        self.samples = 0
+        self._stacks = Counter()
+        self._threads = set()
+        self._stop = threading.Event()
+        self._sampler = None
+
+    def start(self):
+        self._sampler = threading.Thread(target=self._run, name="profiler", daemon=True)
+        self._sampler.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join()
+
+    @contextmanager
+    def track(self):
+        """Sample the calling thread for the duration of the block"""
+        ident = threading.get_ident()
+        self._threads.add(ident)
+        try:
+            yield
+        finally:
+            self._threads.discard(ident)
+
+    def write(self, path: str):
+        """Write the collected stacks as "frame;frame;frame count" lines"""
+        with open(path, "w", encoding="utf-8") as profile_file:
+            for stack, count in self._stacks.most_common():
+                profile_file.write(f"{stack} {count}\n")
+
+    def _run(self):
+        while not self._stop.wait(self.interval_seconds):
+            frames = sys._current_frames()
+            for ident in list(self._threads):
+                frame = frames.get(ident)
+                if frame is not None:
+                    self._stacks[_fold_stack(frame)] += 1
+                    self.samples += 1
+
+def _fold_stack(frame) -> str:
+    """Render a stack root-first, one function per frame"""
+    labels = []
+    while frame is not None:
+        code = frame.f_code
+        labels.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+def should_profile(requested: bool) -> bool:
+    """Whether to profile a request, on explicit opt-in or by sampling"""
+    return requested or (PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE)
+
+def is_valid_profile_id(profile_id: Optional[str]) -> bool:
+    return bool(profile_id) and PROFILE_ID_PATTERN.match(profile_id) is not None
+
+@contextmanager
+def profile_request(profile_id: str):
+    """
+    Profile the work of one request and save it under profile_id
+
+    Stages run through traced() while the block is active are sampled, whichever
+    threadpool worker they land on.
+    """
+    profiler = SamplingProfiler()
+    token = _current_profiler.set(profiler)
+    profiler.start()
+    try:
+        yield profiler
+    finally:
+        _current_profiler.reset(token)
+        _finish(profile_id, profiler)
+
+@asynccontextmanager
+async def profile_request_async(profile_id: str):
+    """profile_request for code on the event loop; stopping the sampler and saving run on the threadpool"""
+    profiler = SamplingProfiler()
+    token = _current_profiler.set(profiler)
+    profiler.start()
+    try:
+        yield profiler
+    finally:
+        _current_profiler.reset(token)
+        await run_in_threadpool(_finish, profile_id, profiler)
+
+def _finish(profile_id: str, profiler: SamplingProfiler):
+    profiler.stop()
+    save_profile(profile_id, profiler)
+
+@contextmanager
+def profile_current_thread(profile_id: str):
+    """Profile everything the calling thread does in the block, e.g. an ingestion run"""
+    with profile_request(profile_id) as profiler, profiler.track():
+        yield profiler
+
+def traced(func):
+    """Wrap func so it is sampled when called on behalf of a profiled request"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        profiler = _current_profiler.get()
+        if profiler is None:
+            return func(*args, **kwargs)
+        with profiler.track():
+            return func(*args, **kwargs)
+    return wrapper
+
+def save_profile(profile_id: str, profiler: SamplingProfiler):
+    """Write a profile to PROFILE_DIR, pruning the oldest beyond PROFILE_MAX_FILES"""
+    try:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        profiler.write(os.path.join(PROFILE_DIR, profile_id + PROFILE_SUFFIX))
+        logger.info(f"Saved profile {profile_id} ({profiler.samples} samples)")
+        for stale_id, _, _ in list_profiles()[PROFILE_MAX_FILES:]:
+            os.remove(os.path.join(PROFILE_DIR, stale_id + PROFILE_SUFFIX))
+    except OSError as e:
+        logger.error(f"Failed to save profile {profile_id}: {str(e)}")
+
+def list_profiles() -> List[Tuple[str, int, datetime]]:
+    """Saved profiles as (profile_id, size_bytes, created_at), newest first"""
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    profiles = []
+    for entry in os.scandir(PROFILE_DIR):
+        if entry.is_file() and entry.name.endswith(PROFILE_SUFFIX):
+            stat = entry.stat()
+            profiles.append((entry.name[:-len(PROFILE_SUFFIX)], stat.st_size, datetime.fromtimestamp(stat.st_mtime)))
+    return sorted(profiles, key=lambda profile: profile[2], reverse=True)
+
+def profile_path(profile_id: str) -> Optional[str]:
+    """Path of a saved profile, or None if the ID is invalid or unknown"""
+    if not is_valid_profile_id(profile_id):
+        return None
+    path = os.path.join(PROFILE_DIR, profile_id + PROFILE_SUFFIX)
+    return path if os.path.isfile(path) else None
@@ -0,0 +1,27 @@
+from dataclasses import dataclass
+from typing import Any, Dict
+
+@dataclass
+class SearchResult:
+    """
+    A single similarity search hit
+
+    Slotted so building k of these per query allocates no per-hit dictionaries;
+    context and response reference the stored strings rather than copying them.
+    orjson serializes the dataclass directly into the SimilarExample schema, so
+    the full /query body needs no intermediate dict per hit either.
+    """
+
+    __slots__ = ("id", "context", "response", "similarity_score")
+
+    id: str
+    context: str
+    response: str
+    similarity_score: float
+
+    def as_reference(self) -> Dict[str, Any]:
+        """JSON-ready form matching the ExampleReference schema"""
+        return {"id": self.id, "similarity_score": self.similarity_score}
+
+    def __repr__(self):
+        return f"SearchResult(id={self.id!r}, similarity_score={self.similarity_score:.4f})"
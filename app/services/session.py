@@ -0,0 +1,118 @@
+import asyncio
+import logging
+import numpy as np
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict, List, Optional
+from app.services.search_result import SearchResult
+from app.config import (
+    SESSION_TTL_SECONDS,
+    SESSION_MAX_SESSIONS,
+    SESSION_SUMMARY_INTERVAL,
+    SESSION_TOPIC_SIMILARITY
+)
+
+logger = logging.getLogger(__name__)
+
+class Session:
+    """State kept for a single multi-turn conversation"""
+
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.summary = ""  # Rolling summary of turns older than recent_turns
+        self.recent_turns: List[Dict[str, str]] = []  # Verbatim {"query", "response"} pairs
+        self.last_query_embedding = None  # Embedding of the query that produced last_examples
+        self.last_examples: List[SearchResult] = []
+        self.last_access = time.monotonic()
+        self.lock = asyncio.Lock()  # Serializes turns within one session
+        self.summary_pending = False  # A background summarization is folding recent_turns
+
+    def add_turn(self, query: str, response: str):
+        """Record a completed turn"""
+        self.recent_turns.append({"query": query, "response": response})
+
+    def is_same_topic(self, query_embedding, threshold=SESSION_TOPIC_SIMILARITY) -> bool:
+        """
+        Check whether a new query stays on the topic of the previous retrieval
+        
+        Args:
+            query_embedding (numpy.ndarray): Embedding of the new query
+            threshold (float): Minimum cosine similarity to count as the same topic
+            
+        Returns:
+            bool: True if the previous turn's examples can be reused
+        """
+        if self.last_query_embedding is None or not self.last_examples:
+            return False
+        previous = self.last_query_embedding
+        norm = np.linalg.norm(previous) * np.linalg.norm(query_embedding)
+        if norm == 0:
+            return False
+        return float(np.dot(previous, query_embedding) / norm) >= threshold
+
+    def needs_summary(self, interval=SESSION_SUMMARY_INTERVAL) -> bool:
+        """Whether enough verbatim turns have accumulated to fold into the summary"""
+        return not self.summary_pending and len(self.recent_turns) >= interval
+
+    def apply_summary(self, summary: str, summarized_turns: int):
+        """Replace the summary and drop the turns it now covers, keeping turns added since"""
+        self.summary = summary
+        self.recent_turns = self.recent_turns[summarized_turns:]
+
+class SessionStore:
+    """In-memory session store with TTL eviction"""
+
+    def __init__(self, ttl_seconds=SESSION_TTL_SECONDS, max_sessions=SESSION_MAX_SESSIONS):
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[str, Session]" = OrderedDict()  # Least recently used first
+        self._lock = threading.Lock()
+
+    def get_or_create(self, session_id: Optional[str] = None) -> Session:
+        """
+        Return the live session for session_id, or start a new one
+
+        Only IDs issued by this store are honored: an unknown or expired session_id
+        gets a fresh session under a new random ID, so clients can't pick an ID
+        that lands them in someone else's conversation.
+
+        Args:
+            session_id (str, optional): Session ID returned by an earlier query
+
+        Returns:
+            Session: The live session, whose session_id may differ from the one passed
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._evict_expired(now)
+            session = self._sessions.get(session_id) if session_id else None
+            if session is None:
+                session = Session(uuid.uuid4().hex)
+                self._sessions[session.session_id] = session
+                if len(self._sessions) > self.max_sessions:
+                    evicted_id, _ = self._sessions.popitem(last=False)
+                    logger.info(f"Evicted session {evicted_id} to stay within {self.max_sessions} sessions")
+            else:
+                self._sessions.move_to_end(session.session_id)
+            session.last_access = now
+            return session
+
+    def delete(self, session_id: str) -> bool:
+        """Remove a session, returning whether it existed"""
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def __len__(self):
+        with self._lock:
+            return len(self._sessions)
+
+    def _evict_expired(self, now: float):
+        """Drop sessions idle for longer than the TTL (caller holds the lock)"""
+        while self._sessions:
+            session_id, session = next(iter(self._sessions.items()))
+            if now - session.last_access < self.ttl_seconds:
+                break
+            del self._sessions[session_id]
+            logger.info(f"Expired session {session_id}")
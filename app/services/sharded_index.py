@@ -0,0 +1,280 @@
+import faiss
+import heapq
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = "manifest.json"
+SNAPSHOT_PREFIX = "snapshot-"
+
+class FaissShard:
+    """One partition of the corpus: a flat L2 index plus the metadata of its vectors"""
+
+    def __init__(self, dimension: int, index=None, metadata: Optional[List[Dict[str, Any]]] = None):
+        self.index = index if index is not None else faiss.IndexFlatL2(dimension)
+        self.metadata = metadata if metadata is not None else []
+
+    def add(self, embeddings: np.ndarray, records: List[Dict[str, Any]]):
+        self.index.add(embeddings)
+        self.metadata.extend(records)
+
+    def search(self, query_embedding: np.ndarray, k: int) -> List[Tuple[float, Dict[str, Any]]]:
+        """Return up to k (L2 distance, record) pairs, nearest first"""
+        if self.index.ntotal == 0:
+            return []
+        distances, indices = self.index.search(query_embedding, min(k, self.index.ntotal))
+        return [
+            (float(distance), self.metadata[idx])
+            for distance, idx in zip(distances[0], indices[0])
+            if 0 <= idx < len(self.metadata)
+        ]
+
+    def clone(self):
+        return FaissShard(self.index.d, faiss.clone_index(self.index), list(self.metadata))
+
+class ShardedFaissIndex:
+    """
+    FAISS corpus split across independent shards
+
+    Vectors are assigned to shards by a hash of their example ID or round-robin per
+    ingested batch. Queries fan out to every shard on a shared thread pool (FAISS
+    releases the GIL while searching) and the per-shard top-k lists are merged by
+    L2 distance, so results match a single index over the whole corpus.
+    """
+
+    # Shared search pool, created on first multi-shard search and sized by the index that
+    # creates it; every index in a process is built from the same FAISS_* settings
+    _executor = None
+    _executor_lock = threading.Lock()
+
+    def __init__(self, dimension: int, num_shards: int = 1, strategy: str = "hash", search_workers: int = 0):
+        if num_shards < 1:
+            raise ValueError("num_shards must be at least 1")
+        if strategy not in ("hash", "batch"):
+            raise ValueError(f"Unsupported shard strategy: {strategy}")
+        self.dimension = dimension
+        self.strategy = strategy
+        self.search_workers = search_workers or num_shards
+        self.shards = [FaissShard(dimension) for _ in range(num_shards)]
+        self.id_to_location: Dict[str, Tuple[int, int]] = {}  # Example ID -> (shard, position)
+        self._next_batch_shard = 0
+
+    @property
+    def num_shards(self) -> int:
+        return len(self.shards)
+
+    @property
+    def ntotal(self) -> int:
+        return sum(shard.index.ntotal for shard in self.shards)
+
+    def add(self, embeddings: np.ndarray, records: List[Dict[str, Any]]):
+        """
+        Add vectors and their metadata, assigning each to a shard
+
+        Args:
+            embeddings (numpy.ndarray): float32 array of shape (n, dimension)
+            records (list): Metadata dictionaries with an 'id' key, one per vector
+        """
+        if self.strategy == "batch" or self.num_shards == 1:
+            self.add_to_shard(self._next_batch_shard, embeddings, records)
+            self._next_batch_shard = (self._next_batch_shard + 1) % self.num_shards
+            return
+
+        assignments = [int(record['id'][:8], 16) % self.num_shards for record in records]
+        for shard_id in range(self.num_shards):
+            rows = [i for i, assigned in enumerate(assignments) if assigned == shard_id]
+            if rows:
+                self.add_to_shard(shard_id, embeddings[rows], [records[i] for i in rows])
+
+    def add_to_shard(self, shard_id: int, embeddings: np.ndarray, records: List[Dict[str, Any]]):
+        """Add vectors to one specific shard, e.g. when building shards separately"""
+        shard = self.shards[shard_id]
+        start = len(shard.metadata)
+        shard.add(embeddings, records)
+        for position, record in enumerate(records, start):
+            self.id_to_location[record['id']] = (shard_id, position)
+
+    def get(self, example_id: str) -> Optional[Dict[str, Any]]:
+        location = self.id_to_location.get(example_id)
+        if location is None:
+            return None
+        shard_id, position = location
+        return self.shards[shard_id].metadata[position]
+
+    def search(self, query_embedding: np.ndarray, k: int) -> List[Tuple[float, Dict[str, Any]]]:
+        """
+        Search all shards and merge into a global top-k
+
+        Args:
+            query_embedding (numpy.ndarray): float32 array of shape (1, dimension)
+            k (int): Number of results
+
+        Returns:
+            list: (L2 distance, record) pairs, nearest first
+        """
+        if self.num_shards == 1:
+            return self.shards[0].search(query_embedding, k)
+
+        executor = self._get_executor(self.search_workers)
+        per_shard = executor.map(lambda shard: shard.search(query_embedding, k), self.shards)
+        return heapq.nsmallest(k, (hit for hits in per_shard for hit in hits), key=lambda hit: hit[0])
+
+    def validate(self):
+        """
+        Check that every shard has one metadata record per vector
+
+        Raises:
+            ValueError: If the index is empty or a shard is inconsistent
+        """
+        if self.ntotal == 0:
+            raise ValueError("FAISS index is empty")
+        for shard_id, shard in enumerate(self.shards):
+            if shard.index.d != self.dimension:
+                raise ValueError(f"Shard {shard_id} has dimension {shard.index.d}, expected {self.dimension}")
+            if shard.index.ntotal != len(shard.metadata):
+                raise ValueError(f"Shard {shard_id} has {shard.index.ntotal} vectors but {len(shard.metadata)} metadata records")
+
+    def clone(self):
+        """Deep copy that can be modified without affecting this index"""
+        copy = ShardedFaissIndex(self.dimension, self.num_shards, self.strategy, self.search_workers)
+        copy.shards = [shard.clone() for shard in self.shards]
+        copy.id_to_location = dict(self.id_to_location)
+        copy._next_batch_shard = self._next_batch_shard
+        return copy
+
+    def save(self, directory: str):
+        """
+        Persist every shard and the manifest
+
+        Shards are written to a new snapshot subdirectory, and the manifest naming it
+        is swapped in with os.replace last. A crash mid-save leaves the previous
+        snapshot and manifest intact; stale snapshots are removed by the next save.
+        """
+        os.makedirs(directory, exist_ok=True)
+        snapshot = tempfile.mkdtemp(prefix=SNAPSHOT_PREFIX, dir=directory)
+        for shard_id in range(self.num_shards):
+            self.save_shard(snapshot, shard_id)
+
+        manifest = {
+            "dimension": self.dimension,
+            "num_shards": self.num_shards,
+            "strategy": self.strategy,
+            "snapshot": os.path.basename(snapshot)
+        }
+        manifest_path = os.path.join(directory, MANIFEST_FILE)
+        with open(manifest_path + ".tmp", "w", encoding="utf-8") as manifest_file:
+            json.dump(manifest, manifest_file)
+            manifest_file.flush()
+            os.fsync(manifest_file.fileno())
+        os.replace(manifest_path + ".tmp", manifest_path)
+
+        for entry in os.scandir(directory):
+            if entry.is_dir() and entry.name.startswith(SNAPSHOT_PREFIX) and entry.path != snapshot:
+                shutil.rmtree(entry.path, ignore_errors=True)
+        logger.info(f"Saved {self.num_shards} FAISS shards ({self.ntotal} vectors) to {snapshot}")
+
+    def save_shard(self, directory: str, shard_id: int):
+        """Persist a single shard into directory, flushed to disk"""
+        os.makedirs(directory, exist_ok=True)
+        shard = self.shards[shard_id]
+        index_path = os.path.join(directory, f"shard_{shard_id}.faiss")
+        faiss.write_index(shard.index, index_path)
+        with open(index_path, "rb") as index_file:
+            os.fsync(index_file.fileno())
+        with open(os.path.join(directory, f"shard_{shard_id}.json"), "w", encoding="utf-8") as metadata_file:
+            json.dump(shard.metadata, metadata_file, ensure_ascii=False, default=str)
+            metadata_file.flush()
+            os.fsync(metadata_file.fileno())
+
+    def load_shard(self, directory: str, shard_id: int):
+        """Replace a single shard with its persisted version"""
+        index = faiss.read_index(os.path.join(directory, f"shard_{shard_id}.faiss"))
+        with open(os.path.join(directory, f"shard_{shard_id}.json"), "r", encoding="utf-8") as metadata_file:
+            metadata = json.load(metadata_file)
+        if index.ntotal != len(metadata):
+            raise ValueError(f"Shard {shard_id} has {index.ntotal} vectors but {len(metadata)} metadata records")
+
+        self.shards[shard_id] = FaissShard(self.dimension, index, metadata)
+        self.id_to_location = {
+            example_id: location
+            for example_id, location in self.id_to_location.items()
+            if location[0] != shard_id
+        }
+        for position, record in enumerate(metadata):
+            self.id_to_location[record['id']] = (shard_id, position)
+
+    @classmethod
+    def load(cls, directory: str, search_workers: int = 0):
+        """Load an index saved with save()"""
+        with open(os.path.join(directory, MANIFEST_FILE), "r", encoding="utf-8") as manifest_file:
+            manifest = json.load(manifest_file)
+        snapshot = os.path.join(directory, manifest["snapshot"])
+        sharded_index = cls(manifest["dimension"], manifest["num_shards"], manifest["strategy"], search_workers)
+        for shard_id in range(sharded_index.num_shards):
+            sharded_index.load_shard(snapshot, shard_id)
+        logger.info(f"Loaded {sharded_index.num_shards} FAISS shards ({sharded_index.ntotal} vectors) from {snapshot}")
+        return sharded_index
+
+    @classmethod
+    def _get_executor(cls, workers: int):
+        with cls._executor_lock:
+            if cls._executor is None:
+                cls._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="faiss-search")
+            return cls._executor
+
+class IndexGeneration:
+    """
+    One published, read-only version of the FAISS index
+
+    VectorDBService swaps generations with a single reference assignment. Readers
+    lease the generation they started on, so a search in flight during a swap
+    finishes against the old version; a retired generation drops its index once
+    its last lease is released.
+    """
+
+    def __init__(self, index: ShardedFaissIndex, number: int):
+        self.index = index
+        self.number = number
+        self._readers = 0
+        self._retired = False
+        self._lock = threading.Lock()
+
+    @property
+    def ntotal(self) -> int:
+        index = self.index
+        return index.ntotal if index is not None else 0
+
+    def try_acquire(self) -> bool:
+        """Take a read lease, failing if the generation has already been freed"""
+        with self._lock:
+            if self.index is None:
+                return False
+            self._readers += 1
+            return True
+
+    def release(self):
+        with self._lock:
+            self._readers -= 1
+            if self._retired and self._readers == 0:
+                self._free()
+
+    def retire(self):
+        """Mark as replaced; the index is freed as soon as no reader holds a lease"""
+        with self._lock:
+            self._retired = True
+            if self._readers == 0:
+                self._free()
+
+    def _free(self):
+        """Drop the index so its memory can be reclaimed (caller holds the lock)"""
+        if self.index is not None:
+            logger.info(f"Freeing FAISS index generation {self.number} ({self.index.ntotal} vectors)")
+            self.index = None
@@ -1,10 +1,15 @@
-import faiss
 import numpy as np
 import pandas as pd
+import hashlib
 import logging
-import uuid
-from typing import List, Dict, Any, Union
+import os
+import threading
+from contextlib import contextmanager
+from typing import List, Dict, Any, Optional, Union
 from app.services.embedding import EmbeddingService
+from app.services.metadata_store import MetadataStore
+from app.services.sharded_index import IndexGeneration, ShardedFaissIndex
+from app.services.search_result import SearchResult
 from app.config import (
     VECTOR_DB_TYPE, 
     TOP_K_RESULTS, 
@@ -12,11 +17,27 @@ from app.config import (
     PINECONE_INDEX_NAME,
     PINECONE_NAMESPACE,
     PINECONE_DIMENSION,
-    PINECONE_METRIC
+    PINECONE_METRIC,
+    PINECONE_METADATA_MODE,
+    METADATA_STORE_PATH,
+    FAISS_NUM_SHARDS,
+    FAISS_SHARD_STRATEGY,
+    FAISS_SEARCH_WORKERS,
+    FAISS_INDEX_PATH
 )
 
 logger = logging.getLogger(__name__)
 
+def example_id(context, response):
+    """
+    Derive a stable identifier for a counseling example from its content
+    
+    The ID only changes when the example text changes, so it can be used
+    directly as a strong ETag and reloading the dataset keeps IDs stable.
+    """
+    digest = hashlib.sha256(f"{context}\x1f{response}".encode("utf-8"))
+    return digest.hexdigest()[:32]
+
 class VectorDBService:
     """Service for storing and retrieving vector embeddings"""
     
@@ -25,12 +46,19 @@ class VectorDBService:
         self.db_type = VECTOR_DB_TYPE
         
         if self.db_type == "faiss":
+            # Serving IndexGeneration; replaced as a whole by _swap_in, never modified in place
             self.index = None
-            self.metadata = []  # Store metadata associated with each vector
+            self._generation_number = 0
+            self._swap_lock = threading.RLock()  # Held by writers from copying the serving index to swapping; readers never take it
+            self._staging = False
+            self._replace = False
+            self._staged_batches = []  # (embeddings, records) loaded into a staging service, added at publish time
         elif self.db_type == "pinecone":
             if not PINECONE_API_KEY:
                 raise ValueError("PINECONE_API_KEY environment variable is required for Pinecone")
             self._init_pinecone()
+            # In 'local' mode Pinecone only returns IDs and scores, texts come from a local store
+            self.metadata_store = MetadataStore(METADATA_STORE_PATH) if PINECONE_METADATA_MODE == "local" else None
         else:
             raise ValueError(f"Unsupported vector database type: {self.db_type}")
     
@@ -59,15 +87,123 @@ class VectorDBService:
             raise
     
     def create_index(self, dimension):
-        """Create a new index"""
+        """Create a new, empty index to build into"""
         if self.db_type == "faiss":
-            self.index = faiss.IndexFlatL2(dimension)
-            self.metadata = []
-            logger.info(f"Created new FAISS index with dimension {dimension}")
+            logger.info(f"Created new FAISS index with dimension {dimension} and {FAISS_NUM_SHARDS} shards")
+            return ShardedFaissIndex(dimension, FAISS_NUM_SHARDS, FAISS_SHARD_STRATEGY, FAISS_SEARCH_WORKERS)
         elif self.db_type == "pinecone":
             # Index is created in _init_pinecone() if it doesn't exist
             pass
     
+    def create_staging(self, replace=False):
+        """
+        Create a service to ingest into without touching the one serving queries
+        
+        For FAISS, load_data on the staging service only embeds and collects batches;
+        publish() adds them all to the index in one swap once ingestion completes.
+        Pinecone upserts become visible as they land, so the live service is returned as-is.
+        
+        Args:
+            replace (bool): Start from an empty index instead of the current contents
+            
+        Returns:
+            VectorDBService: Service to call load_data on
+            
+        Raises:
+            ValueError: If replace is requested for Pinecone
+        """
+        if self.db_type != "faiss":
+            if replace:
+                raise ValueError("replace is only supported for the FAISS backend")
+            return self
+        
+        staging = VectorDBService(self.embedding_service)
+        staging._staging = True
+        staging._replace = replace
+        return staging
+    
+    def publish(self, staging):
+        """
+        Make the data loaded into a staging service created by create_staging serve queries
+        
+        The staged batches are added to a copy of whichever generation is serving at
+        publish time, taken under the writer lock, so concurrent ingestions never
+        overwrite each other's records.
+        
+        Args:
+            staging (VectorDBService): Service returned by create_staging
+        """
+        if staging is self:
+            return
+        if not staging._staged_batches:
+            raise ValueError("Nothing to publish: no data was loaded")
+        
+        with self._swap_lock:
+            index = None if staging._replace else self._clone_serving_index()
+            if index is None:
+                index = self.create_index(staging._staged_batches[0][0].shape[1])
+            for embeddings, records in staging._staged_batches:
+                index.add(embeddings, records)
+            self._swap_in(index)
+    
+    def load_index(self, path=FAISS_INDEX_PATH):
+        """
+        Load a FAISS index previously saved by publish()
+        
+        Args:
+            path (str): Directory the index was saved to
+            
+        Returns:
+            bool: True if an index was found and loaded
+        """
+        if self.db_type != "faiss" or not path or not os.path.isdir(path):
+            return False
+        self._swap_in(ShardedFaissIndex.load(path, FAISS_SEARCH_WORKERS), persist=False)
+        return True
+    
+    def _swap_in(self, index, persist=True):
+        """
+        Validate a fully built index and make it the serving generation
+        
+        The swap is a single reference assignment: searches that already leased the
+        previous generation finish on it, and it is freed when the last one releases it.
+        The index is persisted under the writer lock, so the saved copy is always the
+        latest published one.
+        """
+        index.validate()
+        
+        with self._swap_lock:
+            self._generation_number += 1
+            previous = self.index
+            self.index = IndexGeneration(index, self._generation_number)
+            if previous is not None:
+                previous.retire()
+            logger.info(f"Published FAISS index generation {self._generation_number} with {index.ntotal} records")
+            
+            if persist and FAISS_INDEX_PATH:
+                index.save(FAISS_INDEX_PATH)
+    
+    @contextmanager
+    def _serving_index(self):
+        """Lease the serving FAISS index for the duration of the block (None if not loaded)"""
+        while True:
+            generation = self.index
+            if generation is None:
+                yield None
+                return
+            if generation.try_acquire():
+                break
+            # Freed between reading the reference and leasing it, so a newer generation is live
+        try:
+            yield generation.index
+        finally:
+            generation.release()
+    
+    def _clone_serving_index(self):
+        """Private, writable copy of the serving FAISS index (None if not loaded)"""
+        with self._serving_index() as index:
+            return index.clone() if index is not None else None
+    
     def load_data(self, data_source):
         """
         Load data from CSV file or DataFrame, generate embeddings, and build index
@@ -89,37 +225,54 @@ class VectorDBService:
         if 'Context' not in df.columns or 'Response' not in df.columns:
             raise ValueError("Dataset must contain 'Context' and 'Response' columns")
         
+        ids = [example_id(context, response) for context, response in zip(df['Context'], df['Response'])]
+        
         # Generate embeddings for contexts
         contexts = df['Context'].tolist()
         logger.info(f"Generating embeddings for {len(contexts)} contexts")
         embeddings = self.embedding_service.get_embeddings(contexts)
         
         if self.db_type == "faiss":
-            # Create index with appropriate dimensions if it doesn't exist
-            if self.index is None:
-                self.create_index(embeddings.shape[1])
-                
-            # Add vectors to index
-            self.index.add(np.array(embeddings).astype('float32'))
+            records = df.to_dict('records')
+            for record_id, record in zip(ids, records):
+                record['id'] = record_id
+            batch = (np.array(embeddings).astype('float32'), records)
             
-            # Store metadata
-            self.metadata.extend(df.to_dict('records'))
+            # Staging services collect batches for publish(); on a serving service this is a
+            # one-off load published right away (batched callers should stage and publish once)
+            if self._staging:
+                self._staged_batches.append(batch)
+            else:
+                staging = self.create_staging()
+                staging._staged_batches.append(batch)
+                self.publish(staging)
             
             logger.info(f"Successfully loaded {len(df)} records into FAISS vector database")
             return len(df)
         
         elif self.db_type == "pinecone":
+            records = [
+                {'id': record_id, 'Context': context, 'Response': response}
+                for record_id, context, response in zip(ids, df['Context'], df['Response'])
+            ]
+            
+            # Write texts locally before upserting, so a match never lacks its text
+            if self.metadata_store is not None:
+                self.metadata_store.put_many(records)
+            
             # Prepare vectors for Pinecone using the new format
             vectors_to_upsert = []
-            for i, (_, row) in enumerate(df.iterrows()):
-                vectors_to_upsert.append({
-                    "id": str(uuid.uuid4()),
-                    "values": embeddings[i].tolist(),
-                    "metadata": {
-                        'Context': row['Context'],
-                        'Response': row['Response']
+            for i, record in enumerate(records):
+                vector = {
+                    "id": record['id'],
+                    "values": embeddings[i].tolist()
+                }
+                if self.metadata_store is None:
+                    vector["metadata"] = {
+                        'Context': record['Context'],
+                        'Response': record['Response']
                     }
-                })
+                vectors_to_upsert.append(vector)
             
             # Upsert to Pinecone
             try:
@@ -133,6 +286,19 @@ class VectorDBService:
                 logger.error(f"Error upserting vectors to Pinecone: {str(e)}")
                 raise
     
+    def embed_query(self, query):
+        """
+        Generate the embedding used to search for a query
+        
+        Args:
+            query (str): Query text
+            
+        Returns:
+            numpy.ndarray: 1D query embedding
+        """
+        query_embedding = self.embedding_service.get_embeddings(query)
+        return np.asarray(query_embedding).reshape(-1)
+    
     def search(self, query, k=TOP_K_RESULTS):
         """
         Perform similarity search
@@ -142,50 +308,85 @@ class VectorDBService:
             k (int): Number of top results to return
             
         Returns:
-            list: List of dictionaries containing similar items and their metadata
+            list: List of SearchResult hits, most similar first
         """
-        # Generate embedding for query
-        query_embedding = self.embedding_service.get_embeddings(query)
+        return self.search_by_embedding(self.embed_query(query), k)
+    
+    def search_by_embedding(self, query_embedding, k=TOP_K_RESULTS):
+        """
+        Perform similarity search with a precomputed query embedding
         
+        Args:
+            query_embedding (numpy.ndarray): Query embedding from embed_query
+            k (int): Number of top results to return
+            
+        Returns:
+            list: List of SearchResult hits, most similar first
+        """
         if self.db_type == "faiss":
-            if self.index is None:
-                raise ValueError("FAISS index not initialized. Load data first.")
-                
             # Ensure the embedding is 2D
             if len(query_embedding.shape) == 1:
                 query_embedding = query_embedding.reshape(1, -1)
             
-            # Perform search
-            distances, indices = self.index.search(query_embedding.astype('float32'), k)
+            # Perform search across all shards of the generation serving right now
+            with self._serving_index() as index:
+                if index is None:
+                    raise ValueError("FAISS index not initialized. Load data first.")
+                hits = index.search(query_embedding.astype('float32'), k)
             
-            # Format results
-            results = []
-            for i, idx in enumerate(indices[0]):
-                if idx < len(self.metadata):  # Ensure index is valid
-                    result = self.metadata[idx].copy()
-                    result['similarity_score'] = float(1 / (1 + distances[0][i]))  # Convert distance to similarity score
-                    results.append(result)
+            # Format results, converting distance to similarity score
+            results = [
+                SearchResult(record['id'], record['Context'], record['Response'], 1 / (1 + distance))
+                for distance, record in hits
+            ]
             
         elif self.db_type == "pinecone":
-            # Perform search in Pinecone using the new API
+            # Perform search in Pinecone using the new API; match vectors are never used
             search_results = self.index.query(
                 namespace=PINECONE_NAMESPACE,
                 vector=query_embedding.tolist() if len(query_embedding.shape) == 1 else query_embedding[0].tolist(),
                 top_k=k,
-                include_values=True,
-                include_metadata=True
+                include_values=False,
+                include_metadata=self.metadata_store is None
             )
             
             # Format results
             results = []
             for match in search_results.matches:
-                result = {
-                    'Context': match.metadata['Context'],
-                    'Response': match.metadata['Response'],
-                    'similarity_score': match.score
-                }
-            
-                results.append(result)
+                if self.metadata_store is not None:
+                    metadata = self.metadata_store.get(match.id)
+                    if metadata is None:
+                        logger.warning(f"Example {match.id} missing from local metadata store")
+                        continue
+                else:
+                    metadata = match.metadata
+                results.append(SearchResult(match.id, metadata['Context'], metadata['Response'], match.score))
         
         logger.info(f"Found {len(results)} similar examples for query")
-        return results
\ No newline at end of file
+        return results
+    
+    def get_example(self, example_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a single example by ID
+        
+        Args:
+            example_id (str): Example ID as returned by search
+            
+        Returns:
+            dict or None: Dictionary with id, Context and Response, or None if not found
+        """
+        if self.db_type == "faiss":
+            with self._serving_index() as index:
+                record = index.get(example_id) if index is not None else None
+            if record is None:
+                return None
+            return {'id': example_id, 'Context': record['Context'], 'Response': record['Response']}
+        
+        elif self.db_type == "pinecone":
+            if self.metadata_store is not None:
+                return self.metadata_store.get(example_id)
+            fetched = self.index.fetch(ids=[example_id], namespace=PINECONE_NAMESPACE)
+            vector = fetched.vectors.get(example_id)
+            if vector is None:
+                return None
+            return {'id': example_id, 'Context': vector.metadata['Context'], 'Response': vector.metadata['Response']}
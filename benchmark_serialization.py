@@ -0,0 +1,77 @@
+import argparse
+import orjson
+import timeit
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from app.models.schemas import QueryResponse, SimilarExample
+from app.services.search_result import SearchResult
+
+# Roughly the size of a dataset example: a short user challenge and a long therapist response
+CONTEXT_TEXT = "I have been feeling overwhelmed at work and can't sleep. " * 4
+RESPONSE_TEXT = "It sounds like you are carrying a lot right now, and that is exhausting. " * 20
+RESPONSE_TO_USER = "Thank you for sharing this with me. " * 30
+
+def legacy_path(records):
+    """Per-request work of the previous result path: dict copies, pydantic models, default JSON encoder"""
+    results = []
+    for i, record in enumerate(records):
+        result = record.copy()
+        result['similarity_score'] = float(1 / (1 + i))
+        results.append(result)
+    similar_examples = [
+        SimilarExample(
+            id=item["id"],
+            context=item["Context"],
+            response=item["Response"],
+            similarity_score=item["similarity_score"]
+        ) for item in results
+    ]
+    response = QueryResponse(response=RESPONSE_TO_USER, similar_examples=similar_examples, session_id="session")
+    return JSONResponse(jsonable_encoder(response)).body
+
+def current_path(records):
+    """Per-request work of the current result path: slotted results serialized directly by orjson"""
+    results = _search_results(records)
+    content = {"response": RESPONSE_TO_USER, "session_id": "session", "similar_examples": results}
+    return Response(content=orjson.dumps(content), media_type="application/json").body
+
+def refs_path(records):
+    """Per-request work of the ID-only result path, which still allocates one small dict per hit"""
+    results = _search_results(records)
+    content = {
+        "response": RESPONSE_TO_USER,
+        "session_id": "session",
+        "example_refs": [item.as_reference() for item in results]
+    }
+    return Response(content=orjson.dumps(content), media_type="application/json").body
+
+def _search_results(records):
+    return [
+        SearchResult(record['id'], record['Context'], record['Response'], 1 / (1 + i))
+        for i, record in enumerate(records)
+    ]
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure /query result serialization cost per request")
+    parser.add_argument("--k", type=int, nargs="+", default=[5, 20, 100], help="Result counts to measure")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing rounds; the fastest is reported")
+    args = parser.parse_args()
+
+    print(f"{'k':>5} {'legacy (us)':>12} {'current (us)':>13} {'speedup':>8} {'bytes':>8} {'refs only (us)':>15}")
+    for k in args.k:
+        records = [
+            {'id': f"{i:032x}", 'Context': CONTEXT_TEXT, 'Response': RESPONSE_TEXT}
+            for i in range(k)
+        ]
+        number = max(1, 2000 // k)
+        timings = {}
+        for name, path in (("legacy", legacy_path), ("current", current_path), ("refs", refs_path)):
+            best = min(timeit.repeat(lambda: path(records), number=number, repeat=args.repeat))
+            timings[name] = best / number * 1e6
+        body_size = len(current_path(records))
+        print(f"{k:>5} {timings['legacy']:>12.1f} {timings['current']:>13.1f} "
+              f"{timings['legacy'] / timings['current']:>7.1f}x {body_size:>8} {timings['refs']:>15.1f}")
+
+if __name__ == "__main__":
+    main()
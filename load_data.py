@@ -1,9 +1,12 @@
 import os
+import argparse
 import logging
 import pandas as pd
+from datetime import datetime
 from dotenv import load_dotenv
 from app.services.vector_db import VectorDBService
 from app.services.embedding import EmbeddingService
+from app.services import profiling
 from app.config import PINECONE_API_KEY, PINECONE_INDEX_NAME
 
 # Configure logging
@@ -43,9 +46,10 @@ def main():
             logger.error("Dataset must contain 'Context' and 'Response' columns")
             return
             
-        # Process data in smaller batches to avoid potential issues
+        # Process data in smaller batches to avoid potential issues, publishing once at the end
         batch_size = 30
         total_records = 0
+        staging = vector_db.create_staging()
         
         for i in range(0, len(df), batch_size):
             batch_df = df.iloc[i:i+batch_size]
@@ -53,15 +57,25 @@ def main():
             
             # Load batch into vector database
             try:
-                vector_db.load_data(batch_df)
+                staging.load_data(batch_df)
                 total_records += len(batch_df)
                 logger.info(f"Successfully loaded batch into vector database")
             except Exception as e:
                 logger.error(f"Failed to load batch: {str(e)}")
-                
+        
+        if total_records > 0:
+            vector_db.publish(staging)
         logger.info(f"Successfully loaded total of {total_records} records into vector database")
     except Exception as e:
         logger.error(f"Failed to load data: {str(e)}")
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Load counseling examples into the vector database")
+    parser.add_argument("--profile", action="store_true", help="Save a folded-stack profile of the run to PROFILE_DIR")
+    args = parser.parse_args()
+    
+    if args.profile:
+        with profiling.profile_current_thread(f"load_data-{datetime.now():%Y%m%d-%H%M%S}"):
+            main()
+    else:
+        main()
@@ -17,12 +17,12 @@ st.set_page_config(
 # API endpoint URL - modify if needed based on your deployment
 API_URL = "http://localhost:8000/api/v1/query"
 
-def query_counselor(user_input):
+def query_counselor(user_input, session_id=None):
     """Send user query to the API and get response"""
     try:
         response = requests.post(
             API_URL,
-            json={"query": user_input},
+            json={"query": user_input, "session_id": session_id},
             headers={"Content-Type": "application/json"}
         )
         
@@ -50,6 +50,10 @@ Share your thoughts, and I'll do my best to offer helpful guidance.
 if "messages" not in st.session_state:
     st.session_state.messages = []
 
+# The API keeps the conversation context server-side under this session
+if "session_id" not in st.session_state:
+    st.session_state.session_id = None
+
 # Display chat messages from history
 for message in st.session_state.messages:
     with st.chat_message(message["role"]):
@@ -77,7 +81,8 @@ if prompt := st.chat_input("Share what's on your mind..."):
     # Display assistant response in chat
     with st.chat_message("assistant"):
         with st.spinner("Thinking..."):
-            full_response = query_counselor(prompt)
+            full_response = query_counselor(prompt, st.session_state.session_id)
+            st.session_state.session_id = full_response.get("session_id", st.session_state.session_id)
             response_text = full_response.get("response", "Sorry, I couldn't generate a response")
             similar_examples = full_response.get("similar_examples", [])
             
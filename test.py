@@ -59,9 +59,10 @@ if st.button("Get Response") and user_query:
             # Format similar examples
             similar_examples = [
                 SimilarExample(
-                    context=item["Context"],
-                    response=item["Response"],
-                    similarity_score=item["similarity_score"]
+                    id=item.id,
+                    context=item.context,
+                    response=item.response,
+                    similarity_score=item.similarity_score
                 ) for item in similar_results
             ]
             
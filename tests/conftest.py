@@ -0,0 +1,28 @@
+import hashlib
+import numpy as np
+import pytest
+from app.services import vector_db as vector_db_module
+from app.services.vector_db import VectorDBService
+
+class HashEmbeddingService:
+    """Deterministic embeddings derived from the text, so tests need no model"""
+
+    def get_embeddings(self, texts):
+        if isinstance(texts, str):
+            texts = [texts]
+        return np.array([
+            np.frombuffer(hashlib.sha256(text.encode("utf-8")).digest(), dtype=np.uint8)[:16].astype("float32")
+            for text in texts
+        ])
+
+@pytest.fixture
+def embedding_service():
+    return HashEmbeddingService()
+
+@pytest.fixture
+def faiss_service(monkeypatch, embedding_service):
+    """Empty FAISS-backed VectorDBService with two shards and no persistence"""
+    monkeypatch.setattr(vector_db_module, "VECTOR_DB_TYPE", "faiss")
+    monkeypatch.setattr(vector_db_module, "FAISS_NUM_SHARDS", 2)
+    monkeypatch.setattr(vector_db_module, "FAISS_INDEX_PATH", None)
+    return VectorDBService(embedding_service)
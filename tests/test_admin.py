@@ -0,0 +1,84 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.api import admin, auth
+from app.api.endpoints import get_ingestion_manager
+from app.services.ingestion import IngestionJob
+
+class RecordingManager:
+    """Stands in for IngestionManager, recording submitted jobs instead of running them"""
+
+    def __init__(self):
+        self.jobs = []
+
+    def submit(self, source, replace=False, cleanup=False, profile=False):
+        job = IngestionJob(source, replace=replace, cleanup=cleanup, profile=profile)
+        self.jobs.append(job)
+        return job
+
+    def list_jobs(self):
+        return list(self.jobs)
+
+@pytest.fixture
+def manager():
+    return RecordingManager()
+
+@pytest.fixture
+def client(manager, monkeypatch, tmp_path):
+    monkeypatch.setattr(auth, "ADMIN_API_KEY", "secret")
+    monkeypatch.setattr(admin, "INGESTION_DATA_DIR", str(tmp_path / "data"))
+    monkeypatch.setattr(admin, "INGESTION_UPLOAD_DIR", str(tmp_path / "uploads"))
+    monkeypatch.setattr(admin, "INGESTION_MAX_UPLOAD_BYTES", 100)
+    (tmp_path / "data").mkdir()
+    (tmp_path / "data" / "train.csv").write_text("Context,Response\na,b\n")
+    (tmp_path / "secret.csv").write_text("Context,Response\na,b\n")
+
+    app = FastAPI()
+    app.include_router(admin.router, prefix="/admin")
+    app.dependency_overrides[get_ingestion_manager] = lambda: manager
+    return TestClient(app, headers={"X-Admin-Key": "secret"})
+
+def test_admin_api_is_disabled_without_configured_key(client, monkeypatch):
+    monkeypatch.setattr(auth, "ADMIN_API_KEY", None)
+    assert client.get("/admin/ingest").status_code == 403
+    assert client.get("/admin/ingest", headers={"X-Admin-Key": ""}).status_code == 403
+
+def test_admin_api_requires_matching_key(client):
+    assert client.get("/admin/ingest", headers={"X-Admin-Key": "wrong"}).status_code == 401
+    assert client.get("/admin/ingest", headers={"X-Admin-Key": ""}).status_code == 401
+    assert client.get("/admin/ingest").status_code == 200
+
+def test_ingest_accepts_files_inside_data_dir(client, manager, tmp_path):
+    response = client.post("/admin/ingest", json={"path": str(tmp_path / "data" / "train.csv")})
+    assert response.status_code == 202
+    assert manager.jobs[0].source == str((tmp_path / "data" / "train.csv").resolve())
+
+@pytest.mark.parametrize("relative", ["secret.csv", "data/../secret.csv", "data/../../etc/passwd"])
+def test_ingest_rejects_files_outside_data_dir(client, manager, tmp_path, relative):
+    response = client.post("/admin/ingest", json={"path": str(tmp_path / relative)})
+    assert response.status_code == 400
+    assert manager.jobs == []
+
+def test_upload_within_limit(client, manager, tmp_path):
+    response = client.post("/admin/ingest/upload", content=b"Context,Response\na,b\n")
+    assert response.status_code == 202
+    assert manager.jobs[0].cleanup
+
+def test_upload_over_limit_is_rejected(client, manager, tmp_path):
+    response = client.post("/admin/ingest/upload", content=b"x" * 101)
+    assert response.status_code == 413
+
+    # Without Content-Length the limit is enforced while streaming, and the partial file is removed
+    response = client.post("/admin/ingest/upload", content=iter([b"x" * 60, b"x" * 60]))
+    assert response.status_code == 413
+    assert manager.jobs == []
+    assert list((tmp_path / "uploads").iterdir()) == []
+
+@pytest.mark.parametrize("backend,expected", [("pinecone", 400), ("faiss", 202)])
+def test_replace_is_only_accepted_for_faiss(client, manager, monkeypatch, tmp_path, backend, expected):
+    monkeypatch.setattr(admin, "VECTOR_DB_TYPE", backend)
+    response = client.post("/admin/ingest", json={"path": str(tmp_path / "data" / "train.csv"), "replace": True})
+    assert response.status_code == expected
+    response = client.post("/admin/ingest/upload?replace=true", content=b"Context,Response\na,b\n")
+    assert response.status_code == expected
+    assert len(manager.jobs) == (2 if expected == 202 else 0)
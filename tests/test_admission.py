@@ -0,0 +1,87 @@
+import asyncio
+import pytest
+from app.services.admission import AdmissionController, AdmissionRejected, Deadline
+
+def test_deadline_remaining_never_negative():
+    deadline = Deadline(-1)
+    assert deadline.remaining() == 0
+    assert deadline.expired
+
+def test_requests_beyond_queue_are_shed():
+    async def scenario():
+        admission = AdmissionController(max_in_flight=1, max_queued=1)
+        release = asyncio.Event()
+        outcomes = []
+
+        async def request():
+            try:
+                async with admission.admit(Deadline(5)):
+                    await release.wait()
+                outcomes.append("done")
+            except AdmissionRejected:
+                outcomes.append("shed")
+
+        tasks = [asyncio.create_task(request()) for _ in range(4)]
+        await asyncio.sleep(0.05)
+        assert (admission.in_flight, admission.queued) == (1, 1)
+        release.set()
+        await asyncio.gather(*tasks)
+        return outcomes, admission
+
+    outcomes, admission = asyncio.run(scenario())
+    assert sorted(outcomes) == ["done", "done", "shed", "shed"]
+    assert (admission.in_flight, admission.queued) == (0, 0)
+
+def test_queued_request_is_rejected_when_deadline_passes():
+    async def scenario():
+        admission = AdmissionController(max_in_flight=1, max_queued=5)
+        release = asyncio.Event()
+
+        async def holder():
+            async with admission.admit(Deadline(5)):
+                await release.wait()
+
+        task = asyncio.create_task(holder())
+        await asyncio.sleep(0.01)
+        with pytest.raises(AdmissionRejected):
+            async with admission.admit(Deadline(0.05)):
+                pass
+        assert admission.queued == 0
+        release.set()
+        await task
+
+    asyncio.run(scenario())
+
+def test_slot_is_held_until_abandoned_work_finishes():
+    async def scenario():
+        admission = AdmissionController(max_in_flight=1, max_queued=0)
+        finish_work = asyncio.Event()
+
+        async with admission.admit(Deadline(5)) as slot:
+            work = asyncio.ensure_future(finish_work.wait())
+            slot.hold_until_done(work)
+            # The request gives up on the work, as _run_stage does on timeout
+
+        assert admission.in_flight == 1
+        with pytest.raises(AdmissionRejected):
+            async with admission.admit(Deadline(5)):
+                pass
+
+        finish_work.set()
+        await asyncio.sleep(0.01)
+        assert admission.in_flight == 0
+        async with admission.admit(Deadline(5)):
+            pass
+
+    asyncio.run(scenario())
+
+def test_slot_is_released_immediately_when_work_completed():
+    async def scenario():
+        admission = AdmissionController(max_in_flight=1, max_queued=0)
+        async with admission.admit(Deadline(5)) as slot:
+            work = asyncio.ensure_future(asyncio.sleep(0))
+            slot.hold_until_done(work)
+            await work
+        return admission.in_flight
+
+    assert asyncio.run(scenario()) == 0
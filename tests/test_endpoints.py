@@ -0,0 +1,128 @@
+import asyncio
+import orjson
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.api import endpoints
+from app.models.schemas import ExampleReference, QueryResponse, SimilarExample
+from app.services.admission import AdmissionController
+from app.services.search_result import SearchResult
+from app.services.session import SessionStore
+
+class EchoLLM:
+    """Stands in for LLMService, answering without an API call"""
+
+    def generate_response(self, query, similar_examples, summary="", history=None, timeout=None):
+        return f"Response to: {query}"
+
+    def summarize_conversation(self, summary, turns, timeout=None):
+        return "summary"
+
+@pytest.fixture
+def vector_db(faiss_service):
+    faiss_service.load_data(pd.DataFrame({
+        'Context': [f"I feel stressed about topic {i}" for i in range(20)],
+        'Response': [f"Here is some advice about topic {i}" for i in range(20)]
+    }))
+    return faiss_service
+
+@pytest.fixture
+def session_store():
+    return SessionStore()
+
+@pytest.fixture
+def admission():
+    return AdmissionController()
+
+@pytest.fixture
+def client(vector_db, session_store, admission):
+    llm_service = EchoLLM()
+    app.dependency_overrides = {
+        endpoints.get_vector_db: lambda: vector_db,
+        endpoints.get_llm_service: lambda: llm_service,
+        endpoints.get_session_store: lambda: session_store,
+        endpoints.get_admission_controller: lambda: admission,
+        endpoints.get_ingestion_manager: lambda: None  # Only used while the index is still loading
+    }
+    yield TestClient(app)
+    app.dependency_overrides = {}
+
+def test_query_returns_example_refs_without_texts(client):
+    response = client.post("/api/v1/query", json={"query": "I feel stressed", "include_example_text": False})
+    assert response.status_code == 200
+    body = response.json()
+    assert "similar_examples" not in body
+    assert len(body["example_refs"]) == 5
+    assert set(body["example_refs"][0]) == {"id", "similarity_score"}
+
+@pytest.mark.parametrize("include_example_text", [True, False])
+def test_query_body_matches_response_model(client, include_example_text):
+    response = client.post("/api/v1/query", json={"query": "I feel stressed", "include_example_text": include_example_text})
+    assert response.status_code == 200
+    body = QueryResponse.model_validate(orjson.loads(response.content))
+    assert body.response == "Response to: I feel stressed"
+    assert not body.degraded
+    if include_example_text:
+        assert body.example_refs is None
+        assert len(body.similar_examples) == 5
+        assert body.similar_examples[0].context.startswith("I feel stressed about topic")
+    else:
+        assert body.similar_examples is None
+        assert len(body.example_refs) == 5
+
+def test_search_result_serializes_to_schemas():
+    result = SearchResult("0123456789abcdef", "context", "response", 0.5)
+    assert not hasattr(result, "__dict__")
+    assert SimilarExample.model_validate(orjson.loads(orjson.dumps(result))) == SimilarExample(
+        id="0123456789abcdef", context="context", response="response", similarity_score=0.5
+    )
+    assert result.as_reference() == {"id": "0123456789abcdef", "similarity_score": 0.5}
+    ExampleReference.model_validate(result.as_reference())
+
+def test_query_on_busy_session_times_out_and_frees_its_slot(client, session_store, admission):
+    session_id = client.post("/api/v1/query", json={"query": "I feel stressed"}).json()["session_id"]
+    session = session_store.get_or_create(session_id)
+    turns = list(session.recent_turns)
+    asyncio.run(session.lock.acquire())  # A slow turn of the same session holds the lock
+    try:
+        response = client.post(
+            "/api/v1/query",
+            json={"query": "Still stressed", "session_id": session_id},
+            headers={"X-Request-Timeout": "0.2"}
+        )
+    finally:
+        session.lock.release()
+    assert response.status_code == 504
+    assert "session" in response.json()["detail"]
+    assert admission.in_flight == 0
+    assert session.recent_turns == turns
+
+def test_example_endpoint_returns_cache_headers(client):
+    refs = client.post("/api/v1/query", json={"query": "I feel stressed", "include_example_text": False}).json()["example_refs"]
+    example_id = refs[0]["id"]
+
+    response = client.get(f"/api/v1/examples/{example_id}")
+    assert response.status_code == 200
+    assert response.headers["ETag"] == f'"{example_id}"'
+    assert response.headers["Cache-Control"].startswith("public, max-age=")
+    assert response.json()["id"] == example_id
+    assert response.json()["context"].startswith("I feel stressed about topic")
+
+def test_example_endpoint_answers_304_for_matching_etag(client, vector_db):
+    example_id = vector_db.search("I feel stressed", 1)[0].id
+    response = client.get(f"/api/v1/examples/{example_id}", headers={"If-None-Match": f'"other", "{example_id}"'})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == f'"{example_id}"'
+
+def test_example_endpoint_404_for_unknown_id(client):
+    assert client.get("/api/v1/examples/0123456789abcdef").status_code == 404
+
+def test_removed_example_is_404_even_with_matching_etag(client, vector_db):
+    example_id = vector_db.search("I feel stressed", 1)[0].id
+    staging = vector_db.create_staging(replace=True)
+    staging.load_data(pd.DataFrame({'Context': ["Something else"], 'Response': ["Other advice"]}))
+    vector_db.publish(staging)
+
+    response = client.get(f"/api/v1/examples/{example_id}", headers={"If-None-Match": f'"{example_id}"'})
+    assert response.status_code == 404
@@ -0,0 +1,50 @@
+import time
+import pandas as pd
+from app.services import ingestion
+from app.services.ingestion import IngestionJob, IngestionManager
+
+def _wait(jobs, timeout=10):
+    deadline = time.monotonic() + timeout
+    while any(job.is_active for job in jobs) and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+def test_finished_jobs_beyond_limit_are_forgotten(monkeypatch, tmp_path):
+    monkeypatch.setattr(ingestion, "MAX_FINISHED_JOBS", 3)
+    manager = IngestionManager(vector_db=None, max_workers=2)
+    jobs = [manager.submit(str(tmp_path / f"missing-{i}.csv")) for i in range(6)]
+    _wait(jobs)
+    assert all(job.status == IngestionJob.FAILED for job in jobs)
+
+    latest = manager.submit(str(tmp_path / "missing-latest.csv"))
+    _wait([latest])
+    remaining = manager.list_jobs()
+    assert len(remaining) == 4
+    assert latest in remaining
+    assert manager.get(jobs[0].job_id) is None
+    assert manager.get(jobs[-1].job_id) is jobs[-1]
+
+def test_job_publishes_into_vector_db(faiss_service, tmp_path):
+    path = tmp_path / "train.csv"
+    pd.DataFrame({'Context': [f"context {i}" for i in range(25)], 'Response': ["response"] * 25}).to_csv(path, index=False)
+    manager = IngestionManager(faiss_service, batch_size=10)
+    job = manager.submit(str(path))
+    _wait([job])
+    assert job.status == IngestionJob.COMPLETED
+    assert job.processed_records == 25
+    assert faiss_service.index.ntotal == 25
+
+def test_replace_job_fails_on_pinecone_style_backend(tmp_path):
+    class LiveOnlyBackend:
+        """Backend whose create_staging rejects replace, like the Pinecone one"""
+
+        def create_staging(self, replace=False):
+            if replace:
+                raise ValueError("replace is only supported for the FAISS backend")
+            return self
+
+    path = tmp_path / "train.csv"
+    pd.DataFrame({'Context': ["c"], 'Response': ["r"]}).to_csv(path, index=False)
+    job = IngestionManager(LiveOnlyBackend()).submit(str(path), replace=True)
+    _wait([job])
+    assert job.status == IngestionJob.FAILED
+    assert "FAISS" in job.errors[0]
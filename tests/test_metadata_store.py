@@ -0,0 +1,52 @@
+import multiprocessing
+from app.services.metadata_store import MetadataStore
+
+def _record(writer, i):
+    return {'id': f"{writer}-{i}", 'Context': f"context {writer} {i}", 'Response': "response " * (i % 7)}
+
+def _append(path, writer, batches, batch_size, start):
+    store = MetadataStore(path)
+    start.wait()
+    for batch in range(batches):
+        store.put_many(_record(writer, batch * batch_size + i) for i in range(batch_size))
+
+def test_put_and_get(tmp_path):
+    store = MetadataStore(str(tmp_path))
+    assert store.put_many([_record("a", 1), _record("a", 2)]) == 2
+    assert store.get("a-1") == _record("a", 1)
+    assert store.get("missing") is None
+    assert len(store) == 2
+
+def test_existing_and_repeated_ids_are_skipped(tmp_path):
+    store = MetadataStore(str(tmp_path))
+    store.put_many([_record("a", 1)])
+    assert store.put_many([_record("a", 1), _record("a", 2), _record("a", 2)]) == 1
+    assert len(store) == 2
+
+def test_reopened_store_sees_existing_records(tmp_path):
+    MetadataStore(str(tmp_path)).put_many([_record("a", 1)])
+    assert MetadataStore(str(tmp_path)).get("a-1") == _record("a", 1)
+
+def test_reader_picks_up_appends_from_another_writer(tmp_path):
+    reader = MetadataStore(str(tmp_path))
+    reader.get("b-1")  # Maps the data file before the other writer appends
+    MetadataStore(str(tmp_path)).put_many([_record("b", 1)])
+    assert reader.get("b-1") == _record("b", 1)
+
+def test_concurrent_appends_from_several_processes(tmp_path):
+    path = str(tmp_path)
+    context = multiprocessing.get_context("spawn")
+    start = context.Event()
+    writers = [context.Process(target=_append, args=(path, writer, 200, 2, start)) for writer in range(8)]
+    for process in writers:
+        process.start()
+    start.set()
+    for process in writers:
+        process.join()
+        assert process.exitcode == 0
+
+    store = MetadataStore(path)
+    assert len(store) == 8 * 200 * 2
+    for writer in range(8):
+        for i in range(200 * 2):
+            assert store.get(f"{writer}-{i}") == _record(writer, i)
@@ -0,0 +1,54 @@
+import asyncio
+import time
+import pytest
+from fastapi.concurrency import run_in_threadpool
+from app.services import profiling
+
+def _busy(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+@pytest.fixture(autouse=True)
+def profile_dir(monkeypatch, tmp_path):
+    monkeypatch.setattr(profiling, "PROFILE_DIR", str(tmp_path))
+    return tmp_path
+
+def test_profile_current_thread_saves_samples(profile_dir):
+    with profiling.profile_current_thread("job-1") as profiler:
+        _busy(0.1)
+    assert profiler.samples > 0
+    assert "_busy" in (profile_dir / "job-1.folded").read_text()
+    assert [profile_id for profile_id, _, _ in profiling.list_profiles()] == ["job-1"]
+
+def test_async_profile_samples_traced_threadpool_work(profile_dir):
+    async def handler():
+        async with profiling.profile_request_async("query-1") as profiler:
+            await run_in_threadpool(profiling.traced(_busy), 0.1)
+        return profiler
+
+    profiler = asyncio.run(handler())
+    assert profiler.samples > 0
+    assert "_busy" in (profile_dir / "query-1.folded").read_text()
+
+def test_untraced_work_is_not_sampled(profile_dir):
+    async def handler():
+        async with profiling.profile_request_async("query-2") as profiler:
+            await run_in_threadpool(_busy, 0.05)
+        return profiler
+
+    assert asyncio.run(handler()).samples == 0
+
+def test_profile_path_rejects_invalid_ids(profile_dir):
+    (profile_dir / "query-3.folded").write_text("")
+    assert profiling.profile_path("query-3") is not None
+    assert profiling.profile_path("missing") is None
+    assert profiling.profile_path("../query-3") is None
+
+def test_oldest_profiles_are_pruned(profile_dir, monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILE_MAX_FILES", 2)
+    for i in range(3):
+        with profiling.profile_current_thread(f"job-{i}"):
+            pass
+        time.sleep(0.01)
+    assert sorted(profile_id for profile_id, _, _ in profiling.list_profiles()) == ["job-1", "job-2"]
@@ -0,0 +1,98 @@
+import asyncio
+import pytest
+from app.api.endpoints import _summarize_session
+from app.services.session import SessionStore
+
+class SummarizingLLM:
+    """Stands in for LLMService.summarize_conversation, returning result or raising it"""
+
+    def __init__(self, result):
+        self.result = result
+
+    def summarize_conversation(self, summary, turns, timeout=None):
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+def _session_with_turns(count):
+    session = SessionStore(ttl_seconds=60, max_sessions=10).get_or_create()
+    for i in range(count):
+        session.add_turn(f"query {i}", f"response {i}")
+    session.summary = "earlier summary"
+    session.summary_pending = True
+    return session
+
+def test_new_session_gets_random_id():
+    store = SessionStore(ttl_seconds=60, max_sessions=10)
+    session = store.get_or_create()
+    assert len(session.session_id) == 32
+    assert store.get_or_create(session.session_id) is session
+
+def test_unknown_session_id_is_not_honored():
+    store = SessionStore(ttl_seconds=60, max_sessions=10)
+    session = store.get_or_create("1")
+    assert session.session_id != "1"
+    # A second client guessing the same ID must not land in the first one's conversation
+    assert store.get_or_create("1") is not session
+    assert len(store) == 2
+
+def test_expired_sessions_are_evicted():
+    store = SessionStore(ttl_seconds=60, max_sessions=10)
+    stale = store.get_or_create()
+    fresh = store.get_or_create()
+    stale.last_access -= 120
+
+    assert store.get_or_create(stale.session_id) is not stale
+    assert store.get_or_create(fresh.session_id) is fresh
+    assert len(store) == 2  # fresh plus the replacement for stale
+
+def test_least_recently_used_session_is_evicted_at_capacity():
+    store = SessionStore(ttl_seconds=60, max_sessions=2)
+    first = store.get_or_create()
+    second = store.get_or_create()
+    store.get_or_create(first.session_id)  # first is now the most recently used
+    store.get_or_create()
+
+    assert len(store) == 2
+    assert store.get_or_create(first.session_id) is first
+    assert store.get_or_create(second.session_id) is not second
+
+def test_delete():
+    store = SessionStore(ttl_seconds=60, max_sessions=10)
+    session = store.get_or_create()
+    assert store.delete(session.session_id)
+    assert not store.delete(session.session_id)
+
+def test_apply_summary_keeps_turns_added_while_summarizing():
+    store = SessionStore(ttl_seconds=60, max_sessions=10)
+    session = store.get_or_create()
+    for i in range(4):
+        session.add_turn(f"query {i}", f"response {i}")
+    assert session.needs_summary(interval=4)
+
+    session.summary_pending = True
+    summarized = len(session.recent_turns)
+    assert not session.needs_summary(interval=4)
+    session.add_turn("query 4", "response 4")
+
+    session.apply_summary("summary", summarized)
+    assert session.summary == "summary"
+    assert session.recent_turns == [{"query": "query 4", "response": "response 4"}]
+
+def test_background_summary_folds_summarized_turns():
+    session = _session_with_turns(4)
+    turns = list(session.recent_turns)
+    asyncio.run(_summarize_session(session, SummarizingLLM("new summary"), session.summary, turns))
+    assert session.summary == "new summary"
+    assert session.recent_turns == []
+    assert not session.summary_pending
+
+@pytest.mark.parametrize("result", [None, RuntimeError("OpenAI unavailable")])
+def test_failed_summary_keeps_turns_verbatim(result):
+    session = _session_with_turns(4)
+    turns = list(session.recent_turns)
+    asyncio.run(_summarize_session(session, SummarizingLLM(result), session.summary, turns))
+    assert session.summary == "earlier summary"
+    assert session.recent_turns == turns
+    assert not session.summary_pending
+    assert session.needs_summary(interval=4)  # Retried after the next turn
@@ -0,0 +1,148 @@
+import faiss
+import os
+import numpy as np
+import pytest
+import threading
+from app.services.sharded_index import MANIFEST_FILE, IndexGeneration, ShardedFaissIndex
+
+DIMENSION = 16
+
+def _corpus(n, seed=0):
+    rng = np.random.default_rng(seed)
+    embeddings = rng.random((n, DIMENSION), dtype=np.float32)
+    records = [{'id': f"{i:032x}", 'Context': f"context {i}", 'Response': f"response {i}"} for i in range(n)]
+    return embeddings, records
+
+def _build(num_shards, strategy, embeddings, records, batch_size=25):
+    index = ShardedFaissIndex(DIMENSION, num_shards, strategy)
+    for start in range(0, len(records), batch_size):
+        index.add(embeddings[start:start + batch_size], records[start:start + batch_size])
+    return index
+
+@pytest.mark.parametrize("num_shards,strategy", [(1, "hash"), (3, "hash"), (4, "batch"), (8, "hash")])
+def test_search_matches_single_flat_index(num_shards, strategy):
+    embeddings, records = _corpus(200)
+    flat = faiss.IndexFlatL2(DIMENSION)
+    flat.add(embeddings)
+    sharded = _build(num_shards, strategy, embeddings, records)
+    assert sharded.ntotal == 200
+
+    queries = np.random.default_rng(1).random((20, DIMENSION), dtype=np.float32)
+    for query in queries:
+        query = query.reshape(1, -1)
+        distances, indices = flat.search(query, 10)
+        hits = sharded.search(query, 10)
+        assert [record['id'] for _, record in hits] == [records[i]['id'] for i in indices[0]]
+        assert np.allclose([distance for distance, _ in hits], distances[0], rtol=1e-5)
+        assert [distance for distance, _ in hits] == sorted(distance for distance, _ in hits)
+
+def test_search_with_k_larger_than_corpus():
+    embeddings, records = _corpus(5)
+    sharded = _build(4, "hash", embeddings, records)
+    assert len(sharded.search(embeddings[:1], 10)) == 5
+
+def test_get_by_id():
+    embeddings, records = _corpus(50)
+    sharded = _build(3, "hash", embeddings, records)
+    assert sharded.get(records[17]['id']) == records[17]
+    assert sharded.get("unknown") is None
+
+def test_clone_is_independent():
+    embeddings, records = _corpus(50)
+    sharded = _build(3, "hash", embeddings, records)
+    copy = sharded.clone()
+    more_embeddings, more_records = _corpus(10, seed=2)
+    copy.add(more_embeddings, [dict(record, id=f"{1000 + i:032x}") for i, record in enumerate(more_records)])
+    assert sharded.ntotal == 50
+    assert copy.ntotal == 60
+    copy.validate()
+
+def test_save_and_load_round_trip(tmp_path):
+    embeddings, records = _corpus(100)
+    sharded = _build(3, "hash", embeddings, records)
+    sharded.save(str(tmp_path))
+    loaded = ShardedFaissIndex.load(str(tmp_path))
+    loaded.validate()
+
+    query = embeddings[:1]
+    assert [record['id'] for _, record in loaded.search(query, 5)] == [record['id'] for _, record in sharded.search(query, 5)]
+
+def test_save_replaces_previous_snapshot(tmp_path):
+    embeddings, records = _corpus(100)
+    _build(3, "hash", embeddings[:50], records[:50]).save(str(tmp_path))
+    _build(3, "hash", embeddings, records).save(str(tmp_path))
+
+    assert ShardedFaissIndex.load(str(tmp_path)).ntotal == 100
+    snapshots = [entry for entry in os.listdir(tmp_path) if entry != MANIFEST_FILE]
+    assert len(snapshots) == 1
+
+def test_interrupted_save_keeps_previous_index(tmp_path, monkeypatch):
+    embeddings, records = _corpus(100)
+    _build(3, "hash", embeddings[:50], records[:50]).save(str(tmp_path))
+
+    def crash(directory, shard_id):
+        raise OSError("disk full")
+    bigger = _build(3, "hash", embeddings, records)
+    monkeypatch.setattr(bigger, "save_shard", crash)
+    with pytest.raises(OSError):
+        bigger.save(str(tmp_path))
+
+    assert ShardedFaissIndex.load(str(tmp_path)).ntotal == 50
+
+def test_validate_rejects_empty_and_inconsistent_indexes():
+    with pytest.raises(ValueError):
+        ShardedFaissIndex(DIMENSION, 2).validate()
+
+    embeddings, records = _corpus(10)
+    sharded = _build(2, "hash", embeddings, records)
+    sharded.shards[0].metadata.pop()
+    with pytest.raises(ValueError):
+        sharded.validate()
+
+def test_retired_generation_is_freed_when_last_lease_is_released():
+    embeddings, records = _corpus(10)
+    generation = IndexGeneration(_build(2, "hash", embeddings, records), 1)
+    assert generation.try_acquire()
+    assert generation.try_acquire()
+
+    generation.retire()
+    assert generation.index is not None  # Still leased by two readers
+    generation.release()
+    assert generation.index is not None
+    generation.release()
+    assert generation.index is None
+    assert generation.ntotal == 0
+    assert not generation.try_acquire()
+
+def test_retired_generation_without_readers_is_freed_immediately():
+    embeddings, records = _corpus(10)
+    generation = IndexGeneration(_build(2, "hash", embeddings, records), 1)
+    generation.retire()
+    assert generation.index is None
+
+def test_generation_under_concurrent_leases_and_retire():
+    embeddings, records = _corpus(50)
+    generation = IndexGeneration(_build(2, "hash", embeddings, records), 1)
+    errors = []
+
+    def reader():
+        for _ in range(200):
+            if not generation.try_acquire():
+                return
+            try:
+                # A lease guarantees the index stays usable until it is released
+                generation.index.search(embeddings[:1], 3)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                generation.release()
+
+    readers = [threading.Thread(target=reader) for _ in range(8)]
+    for thread in readers:
+        thread.start()
+    generation.retire()
+    for thread in readers:
+        thread.join()
+
+    assert errors == []
+    assert generation.index is None
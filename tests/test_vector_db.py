@@ -0,0 +1,102 @@
+import threading
+import pandas as pd
+import pytest
+from app.services import vector_db as vector_db_module
+from app.services.vector_db import VectorDBService
+
+def _frame(prefix, n):
+    return pd.DataFrame({
+        'Context': [f"{prefix} context {i}" for i in range(n)],
+        'Response': [f"{prefix} response {i}" for i in range(n)]
+    })
+
+@pytest.fixture
+def service(faiss_service):
+    return faiss_service
+
+def test_load_data_on_serving_service_appends(service):
+    service.load_data(_frame("a", 10))
+    service.load_data(_frame("b", 5))
+    assert service.index.ntotal == 15
+    assert service.index.number == 2
+
+def test_staged_batches_are_published_in_one_generation(service):
+    service.load_data(_frame("base", 10))
+    staging = service.create_staging()
+    for i in range(5):
+        staging.load_data(_frame(f"batch{i}", 4))
+    assert service.index.ntotal == 10  # Nothing is visible before publish
+
+    service.publish(staging)
+    assert service.index.ntotal == 30
+    assert service.index.number == 2
+
+def test_overlapping_ingestions_keep_each_others_records(service):
+    service.load_data(_frame("base", 10))
+    first = service.create_staging()
+    second = service.create_staging()
+    first.load_data(_frame("first", 7))
+    second.load_data(_frame("second", 3))
+
+    service.publish(first)
+    service.publish(second)
+    assert service.index.ntotal == 20
+
+def test_concurrent_publishes_lose_no_records(service):
+    service.load_data(_frame("base", 10))
+    stagings = [service.create_staging() for _ in range(8)]
+    for i, staging in enumerate(stagings):
+        staging.load_data(_frame(f"job{i}", 5))
+
+    threads = [threading.Thread(target=service.publish, args=(staging,)) for staging in stagings]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert service.index.ntotal == 10 + 8 * 5
+
+def test_replace_staging_drops_previous_contents(service):
+    service.load_data(_frame("old", 10))
+    staging = service.create_staging(replace=True)
+    staging.load_data(_frame("new", 4))
+    service.publish(staging)
+    assert service.index.ntotal == 4
+
+def test_publish_without_data_fails(service):
+    with pytest.raises(ValueError):
+        service.publish(service.create_staging())
+
+def test_searches_during_swaps(service):
+    service.load_data(_frame("base", 20))
+    query = service.embed_query("base context 3")
+    errors = []
+    stop = threading.Event()
+
+    def searcher():
+        while not stop.is_set():
+            try:
+                assert len(service.search_by_embedding(query, 5)) == 5
+            except Exception as e:
+                errors.append(e)
+
+    searchers = [threading.Thread(target=searcher) for _ in range(4)]
+    for thread in searchers:
+        thread.start()
+    for i in range(20):
+        service.load_data(_frame(f"swap{i}", 2))
+    stop.set()
+    for thread in searchers:
+        thread.join()
+
+    assert errors == []
+    assert service.index.ntotal == 60
+
+def test_published_index_is_persisted_and_reloaded(service, embedding_service, monkeypatch, tmp_path):
+    monkeypatch.setattr(vector_db_module, "FAISS_INDEX_PATH", str(tmp_path))
+    service.load_data(_frame("a", 12))
+
+    reloaded = VectorDBService(embedding_service)
+    assert reloaded.load_index(str(tmp_path))
+    assert reloaded.index.ntotal == 12
+    example = service.search("a context 4", 1)[0]
+    assert reloaded.get_example(example.id)['Context'] == "a context 4"